@@ -8,6 +8,10 @@ from app.pages.settings import settings_page
 from app.pages.batch_print import batch_print_page
 from app.states.receipt_state import ReceiptState
 from app.states.settings_state import SettingsState
+from app.states.reports_state import ReportsState
+from app.db_init import initialize_db
+from app.utils.number_to_words import prewarm_amount_words
+from app.utils.export import export_api
 
 app = rx.App(
     theme=rx.theme(
@@ -37,21 +41,50 @@ app = rx.App(
             }
             """),
     ],
+    api_transformer=export_api,
+)
+app.register_lifespan_task(initialize_db)
+app.register_lifespan_task(prewarm_amount_words)
+app.add_page(
+    index,
+    route="/",
+    on_load=[
+        ReceiptState.on_mount,
+        SettingsState.on_mount,
+        ReceiptState.watch_receipts,
+    ],
+)
+app.add_page(
+    new_receipt_page,
+    route="/receipts/new",
+    on_load=[ReceiptState.open_receipt_form, SettingsState.on_mount],
 )
-app.add_page(index, route="/", on_load=[ReceiptState.on_mount, SettingsState.on_mount])
-app.add_page(new_receipt_page, route="/receipts/new", on_load=SettingsState.on_mount)
 app.add_page(
     receipts_list_page,
     route="/receipts",
-    on_load=[ReceiptState.on_mount, SettingsState.on_mount],
+    on_load=[
+        ReceiptState.load_receipts,
+        SettingsState.on_mount,
+        ReceiptState.watch_receipts,
+    ],
 )
 app.add_page(
     view_receipt_page,
     route="/receipts/view/[ref_id]",
     on_load=[ReceiptState.load_view_receipt, SettingsState.on_mount],
 )
-app.add_page(reports_page, route="/reports", on_load=SettingsState.on_mount)
-app.add_page(settings_page, route="/settings", on_load=SettingsState.on_mount)
 app.add_page(
-    batch_print_page, route="/receipts/batch-print", on_load=SettingsState.on_mount
+    reports_page,
+    route="/reports",
+    on_load=[ReportsState.load_report, SettingsState.on_mount],
+)
+app.add_page(
+    settings_page,
+    route="/settings",
+    on_load=[SettingsState.on_mount, SettingsState.load_cache_stats],
+)
+app.add_page(
+    batch_print_page,
+    route="/receipts/batch-print",
+    on_load=[ReceiptState.load_print_receipts, SettingsState.on_mount],
 )
\ No newline at end of file
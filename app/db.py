@@ -1,7 +1,29 @@
 import reflex as rx
 from datetime import datetime
+import sqlite3
+import sqlalchemy
 import sqlmodel
 
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -32000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+
+@sqlalchemy.event.listens_for(sqlalchemy.engine.Engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Apply WAL journaling and tuning pragmas to every SQLite connection."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
 
 class Receipt(sqlmodel.SQLModel, table=True):
     id: int | None = sqlmodel.Field(default=None, primary_key=True)
@@ -9,14 +31,40 @@ class Receipt(sqlmodel.SQLModel, table=True):
     admission_number: str
     class_grade: str
     payer_name: str
-    amount: float
+    amount_cents: int
     payment_method: str
     reference_id: str = sqlmodel.Field(unique=True, index=True)
     date: str
+    day: str = ""
     notes: str = ""
     created_at: str = ""
 
 
+class ReceiptRollup(sqlmodel.SQLModel, table=True):
+    day: str = sqlmodel.Field(primary_key=True)
+    class_grade: str = sqlmodel.Field(primary_key=True)
+    payment_method: str = sqlmodel.Field(primary_key=True)
+    total_cents: int = 0
+    receipt_count: int = 0
+
+
+class DataVersion(sqlmodel.SQLModel, table=True):
+    id: int | None = sqlmodel.Field(default=None, primary_key=True)
+    version: int = 0
+
+
+class ReferenceCounter(sqlmodel.SQLModel, table=True):
+    prefix: str = sqlmodel.Field(primary_key=True)
+    last_value: int = 0
+
+
+class SubmissionKey(sqlmodel.SQLModel, table=True):
+    key: str = sqlmodel.Field(primary_key=True)
+    receipt_id: int | None = None
+    reference_id: str = ""
+    expires_at: str = sqlmodel.Field(index=True)
+
+
 class SchoolInfo(sqlmodel.SQLModel, table=True):
     id: int | None = sqlmodel.Field(default=None, primary_key=True)
     name: str
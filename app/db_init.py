@@ -1,15 +1,282 @@
 import reflex as rx
 import sqlmodel
 import logging
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
 from app.db import Receipt, SchoolInfo, Settings
+from app.utils.references import allocate_reference
+from app.utils.search import CODE_INDEX_DDL, SEARCH_INDEX_DDL
+
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def _create_search_index(connection):
+    """Create the receipt full-text index and its sync triggers."""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'receipt_fts'"
+    ).first()
+    for statement in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    if not exists:
+        connection.exec_driver_sql(
+            "INSERT INTO receipt_fts(receipt_fts) VALUES ('rebuild')"
+        )
+
+
+def _add_receipt_indexes(connection):
+    """Index the columns the list, dashboard and report queries filter on."""
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receipt_date ON receipt (date)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receipt_class_grade_date "
+        "ON receipt (class_grade, date)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receipt_admission_number_date "
+        "ON receipt (admission_number, date)"
+    )
+    connection.exec_driver_sql("ANALYZE receipt")
+
+
+def _add_receipt_day(connection):
+    """Add the normalized receipt day column and move the indexes onto it."""
+    columns = connection.exec_driver_sql("PRAGMA table_info(receipt)").all()
+    if "day" not in {column[1] for column in columns}:
+        connection.exec_driver_sql(
+            "ALTER TABLE receipt ADD COLUMN day VARCHAR NOT NULL DEFAULT ''"
+        )
+    connection.exec_driver_sql(
+        "UPDATE receipt SET day = substr(date, 1, 10) WHERE day = ''"
+    )
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_receipt_date")
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_receipt_class_grade_date")
+    connection.exec_driver_sql(
+        "DROP INDEX IF EXISTS ix_receipt_admission_number_date"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receipt_day ON receipt (day)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receipt_class_grade_day "
+        "ON receipt (class_grade, day)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receipt_admission_number_day "
+        "ON receipt (admission_number, day)"
+    )
+    connection.exec_driver_sql("ANALYZE receipt")
+
+
+def _store_amounts_in_cents(connection):
+    """Replace the float amount column with integer cents."""
+    columns = connection.exec_driver_sql("PRAGMA table_info(receipt)").all()
+    names = {column[1] for column in columns}
+    if "amount_cents" not in names:
+        connection.exec_driver_sql(
+            "ALTER TABLE receipt ADD COLUMN amount_cents INTEGER NOT NULL DEFAULT 0"
+        )
+    if "amount" in names:
+        connection.exec_driver_sql(
+            "UPDATE receipt SET amount_cents = CAST(ROUND(amount * 100) AS INTEGER)"
+        )
+        connection.exec_driver_sql("ALTER TABLE receipt DROP COLUMN amount")
+
+
+ROLLUP_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_rollup_insert AFTER INSERT ON receipt BEGIN
+        INSERT INTO receiptrollup (
+            day, class_grade, payment_method, total_cents, receipt_count
+        ) VALUES (new.day, new.class_grade, new.payment_method, new.amount_cents, 1)
+        ON CONFLICT (day, class_grade, payment_method) DO UPDATE SET
+            total_cents = total_cents + excluded.total_cents,
+            receipt_count = receipt_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_rollup_delete AFTER DELETE ON receipt BEGIN
+        UPDATE receiptrollup SET
+            total_cents = total_cents - old.amount_cents,
+            receipt_count = receipt_count - 1
+        WHERE day = old.day
+            AND class_grade = old.class_grade
+            AND payment_method = old.payment_method;
+        DELETE FROM receiptrollup
+        WHERE day = old.day
+            AND class_grade = old.class_grade
+            AND payment_method = old.payment_method
+            AND receipt_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_rollup_update
+    AFTER UPDATE OF day, class_grade, payment_method, amount_cents ON receipt BEGIN
+        UPDATE receiptrollup SET
+            total_cents = total_cents - old.amount_cents,
+            receipt_count = receipt_count - 1
+        WHERE day = old.day
+            AND class_grade = old.class_grade
+            AND payment_method = old.payment_method;
+        DELETE FROM receiptrollup
+        WHERE day = old.day
+            AND class_grade = old.class_grade
+            AND payment_method = old.payment_method
+            AND receipt_count <= 0;
+        INSERT INTO receiptrollup (
+            day, class_grade, payment_method, total_cents, receipt_count
+        ) VALUES (new.day, new.class_grade, new.payment_method, new.amount_cents, 1)
+        ON CONFLICT (day, class_grade, payment_method) DO UPDATE SET
+            total_cents = total_cents + excluded.total_cents,
+            receipt_count = receipt_count + 1;
+    END
+    """,
+]
+
+
+def _create_receipt_rollup(connection):
+    """Build the daily rollup and the triggers that keep it current."""
+    for statement in ROLLUP_TRIGGERS:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql("DELETE FROM receiptrollup")
+    connection.exec_driver_sql(
+        """
+        INSERT INTO receiptrollup (
+            day, class_grade, payment_method, total_cents, receipt_count
+        )
+        SELECT day, class_grade, payment_method, SUM(amount_cents), COUNT(*)
+        FROM receipt
+        GROUP BY day, class_grade, payment_method
+        """
+    )
+
+
+def _track_write_version(connection):
+    """Bump a single-row write version whenever receipts change."""
+    connection.exec_driver_sql(
+        "INSERT OR IGNORE INTO dataversion (id, version) VALUES (1, 0)"
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        connection.exec_driver_sql(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS receipt_version_{event.lower()}
+            AFTER {event} ON receipt BEGIN
+                UPDATE dataversion SET version = version + 1 WHERE id = 1;
+            END
+            """
+        )
+
+
+def _index_rollup_by_class(connection):
+    """Cover the dashboard and report rollup queries that group or filter by class."""
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_receiptrollup_class_grade_day "
+        "ON receiptrollup (class_grade, day, total_cents, receipt_count)"
+    )
+    connection.exec_driver_sql("ANALYZE receiptrollup")
+
+
+def _create_code_search_index(connection):
+    """Index admission numbers and references by trigram for substring search."""
+    for statement in CODE_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql(
+        "INSERT INTO receipt_code_fts(receipt_code_fts) VALUES ('rebuild')"
+    )
+
+
+MIGRATIONS = [
+    _create_search_index,
+    _add_receipt_indexes,
+    _add_receipt_day,
+    _store_amounts_in_cents,
+    _create_receipt_rollup,
+    _track_write_version,
+    _index_rollup_by_class,
+    _create_code_search_index,
+]
+
+
+def run_migrations(connection):
+    """Apply pending migrations, tracking progress in PRAGMA user_version."""
+    version = connection.exec_driver_sql("PRAGMA user_version").scalar() or 0
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        logging.info(f"Applying database migration {number}: {migration.__name__}")
+        migration(connection)
+        connection.exec_driver_sql(f"PRAGMA user_version = {number}")
+
+
+def seed_sample_data(session: sqlmodel.Session):
+    """Seed database with sample data if empty."""
+    if session.exec(sqlmodel.select(Receipt.id)).first():
+        return
+    logging.info("Seeding database with sample receipts...")
+    classes = ["GRADE 1", "GRADE 2", "GRADE 3", "PP1", "PP2"]
+    methods = ["Cash", "Bank Transfer", "Mobile Money"]
+    names = [
+        "John Doe",
+        "Jane Smith",
+        "Alice Jones",
+        "Bob Brown",
+        "Charlie Davis",
+    ]
+    for i in range(15):
+        date_offset = random.randint(0, 60)
+        r_date = (datetime.now() - timedelta(days=date_offset)).isoformat()
+        receipt = Receipt(
+            student_name=random.choice(names),
+            admission_number=f"ADM{1000 + i}",
+            class_grade=random.choice(classes),
+            payer_name="Parent",
+            amount_cents=random.randint(100, 5000) * 100,
+            payment_method=random.choice(methods),
+            reference_id=allocate_reference(session.connection(), r_date),
+            date=r_date,
+            day=r_date[:10],
+            created_at=datetime.now().isoformat(),
+            notes="Sample receipt",
+        )
+        session.add(receipt)
+    session.flush()
+
+
+def check_sqlite_version(version: tuple = sqlite3.sqlite_version_info):
+    """Refuse to start on a SQLite too old for the migrations.
+
+    DROP COLUMN needs 3.35 and the trigram search tokenizer 3.34.
+    """
+    if version < MIN_SQLITE_VERSION:
+        required = ".".join(map(str, MIN_SQLITE_VERSION))
+        found = ".".join(map(str, version))
+        raise RuntimeError(
+            f"SQLite {required} or newer is required, but Python is linked "
+            f"against SQLite {found}. Upgrade Python or its sqlite3 library."
+        )
 
 
 def initialize_db():
-    """Initialize the database tables if they do not exist."""
+    """Create tables, apply migrations and seed sample data at startup.
+
+    Everything runs in one BEGIN IMMEDIATE transaction, so workers starting
+    at the same time queue on the database write lock instead of racing.
+    Set TOYA_SEED_SAMPLE_DATA=0 to skip the sample receipts. A failure
+    stops startup rather than serving against a half-migrated schema.
+    """
+    check_sqlite_version()
     try:
         with rx.session() as session:
             engine = session.get_bind()
-            sqlmodel.SQLModel.metadata.create_all(engine)
-            logging.info("Database tables verified/initialized successfully.")
+        with engine.connect() as connection:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            sqlmodel.SQLModel.metadata.create_all(connection)
+            run_migrations(connection)
+            if os.environ.get("TOYA_SEED_SAMPLE_DATA", "1") != "0":
+                with sqlmodel.Session(bind=connection) as session:
+                    seed_sample_data(session)
+            connection.commit()
+        logging.info("Database tables verified/initialized successfully.")
     except Exception as e:
-        logging.exception(f"Database initialization failed: {e}")
\ No newline at end of file
+        logging.exception(f"Database initialization failed: {e}")
+        raise
@@ -22,7 +22,7 @@ def batch_print_item(receipt) -> rx.Component:
             rx.el.div(
                 rx.el.div(
                     rx.el.span("Date:", class_name="font-semibold mr-2"),
-                    rx.el.span(receipt.date.split("T")[0]),
+                    rx.el.span(receipt.day),
                     class_name="text-xs",
                 ),
                 rx.el.div(
@@ -36,7 +36,7 @@ def batch_print_item(receipt) -> rx.Component:
                 rx.el.p(f"Student: {receipt.student_name}", class_name="text-sm"),
                 rx.el.p(f"Class: {receipt.class_grade}", class_name="text-sm"),
                 rx.el.p(
-                    f"Amount: ${receipt.amount:,.2f}",
+                    f"Amount: ${receipt.amount_cents / 100:,.2f}",
                     class_name="text-sm font-bold mt-1",
                 ),
                 class_name="mb-4",
@@ -62,17 +62,20 @@ def batch_print_page() -> rx.Component:
                     on_click=rx.call_script("window.print()"),
                     class_name="bg-indigo-600 text-white px-4 py-2 rounded-lg hover:bg-indigo-700 shadow-sm",
                 ),
+                rx.el.button(
+                    "Download PDF",
+                    on_click=ReceiptState.download_batch_pdf("a4"),
+                    class_name="ml-4 px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700",
+                ),
+                rx.el.button(
+                    "Thermal PDF",
+                    on_click=ReceiptState.download_batch_pdf("thermal"),
+                    class_name="ml-2 px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-100 text-gray-700",
+                ),
                 class_name="no-print p-4 flex items-center bg-gray-50 border-b",
             ),
             rx.el.div(
-                rx.foreach(
-                    ReceiptState.all_receipts,
-                    lambda r: rx.cond(
-                        ReceiptState.selected_receipt_ids.contains(r.reference_id),
-                        batch_print_item(r),
-                        rx.fragment(),
-                    ),
-                ),
+                rx.foreach(ReceiptState.print_receipts, batch_print_item),
                 class_name="p-8 max-w-2xl mx-auto",
                 id="printable-area",
             ),
@@ -37,11 +37,11 @@ def recent_receipt_row(receipt, index: int) -> rx.Component:
             class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-600",
         ),
         rx.el.td(
-            f"${receipt.amount:.2f}",
+            f"${receipt.amount_cents / 100:.2f}",
             class_name="px-6 py-4 whitespace-nowrap text-sm font-semibold text-green-600",
         ),
         rx.el.td(
-            receipt.date.split("T")[0],
+            receipt.day,
             class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
         ),
         class_name="hover:bg-gray-50 transition-colors border-b border-gray-100 last:border-0",
@@ -165,7 +165,9 @@ def new_receipt_page() -> rx.Component:
                     rx.el.button(
                         "Save Receipt",
                         type="button",
-                        on_click=ReceiptState.save_receipt,
+                        on_click=ReceiptState.save_receipt(
+                            ReceiptState.submission_key
+                        ),
                         class_name="px-6 py-3 bg-indigo-600 text-white rounded-xl font-medium hover:bg-indigo-700 shadow-sm hover:shadow transition-all",
                     ),
                     class_name="flex justify-end gap-4 mt-6",
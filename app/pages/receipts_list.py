@@ -45,14 +45,80 @@ def filter_controls() -> rx.Component:
     )
 
 
+def bulk_actions() -> rx.Component:
+    return rx.cond(
+        ReceiptState.selection_count > 0,
+        rx.el.div(
+            rx.el.div(
+                rx.el.p(
+                    f"{ReceiptState.selection_count} selected",
+                    class_name="text-sm font-medium text-gray-700",
+                ),
+                rx.cond(
+                    ~ReceiptState.select_all_matching
+                    & (ReceiptState.total_count > ReceiptState.selection_count),
+                    rx.el.button(
+                        f"Select all {ReceiptState.total_count_label} matching",
+                        on_click=ReceiptState.select_all_matching_filters,
+                        class_name="text-sm font-medium text-indigo-600 hover:text-indigo-700",
+                    ),
+                ),
+                class_name="flex items-center gap-3",
+            ),
+            rx.el.div(
+                rx.el.select(
+                    rx.el.option("Move to class...", value=""),
+                    rx.el.option("PLAY GROUP", value="PLAY GROUP"),
+                    rx.el.option("PP1", value="PP1"),
+                    rx.el.option("PP2", value="PP2"),
+                    rx.el.option("GRADE 1", value="GRADE 1"),
+                    rx.el.option("GRADE 2", value="GRADE 2"),
+                    rx.el.option("GRADE 3", value="GRADE 3"),
+                    rx.el.option("GRADE 4", value="GRADE 4"),
+                    rx.el.option("GRADE 5", value="GRADE 5"),
+                    rx.el.option("GRADE 6", value="GRADE 6"),
+                    rx.el.option("GRADE 7", value="GRADE 7"),
+                    rx.el.option("GRADE 8", value="GRADE 8"),
+                    rx.el.option("GRADE 9", value="GRADE 9"),
+                    value=ReceiptState.bulk_class_grade,
+                    on_change=ReceiptState.set_bulk_class_grade,
+                    class_name="rounded-lg border-gray-300 border p-2 text-sm bg-white",
+                ),
+                rx.el.button(
+                    "Move",
+                    on_click=ReceiptState.reassign_selected_class,
+                    class_name="px-3 py-2 border border-gray-300 rounded-lg text-sm text-gray-700 hover:bg-gray-50",
+                ),
+                rx.el.button(
+                    rx.icon("download", class_name="h-4 w-4 mr-1"),
+                    "Export",
+                    on_click=ReceiptState.export_selected,
+                    class_name="inline-flex items-center px-3 py-2 border border-gray-300 rounded-lg text-sm text-gray-700 hover:bg-gray-50",
+                ),
+                rx.el.button(
+                    rx.icon("trash-2", class_name="h-4 w-4 mr-1"),
+                    "Delete",
+                    on_click=ReceiptState.confirm_bulk_delete,
+                    class_name="inline-flex items-center px-3 py-2 border border-red-200 rounded-lg text-sm text-red-600 hover:bg-red-50",
+                ),
+                rx.el.button(
+                    "Clear",
+                    on_click=ReceiptState.clear_selection,
+                    class_name="px-3 py-2 text-sm text-gray-500 hover:text-gray-700",
+                ),
+                class_name="flex flex-wrap items-center gap-2",
+            ),
+            class_name="flex flex-col md:flex-row md:items-center justify-between gap-3 bg-indigo-50 border border-indigo-100 rounded-xl px-4 py-3 mb-4",
+        ),
+    )
+
+
 def receipt_row(receipt) -> rx.Component:
     return rx.el.tr(
         rx.el.td(
             rx.el.input(
                 type="checkbox",
-                checked=ReceiptState.selected_receipt_ids.contains(
-                    receipt.reference_id
-                ),
+                checked=ReceiptState.page_selected.contains(receipt.reference_id),
                 on_change=lambda v: ReceiptState.toggle_selection(receipt.reference_id),
                 class_name="rounded border-gray-300 text-indigo-600 focus:ring-indigo-500",
             ),
@@ -60,7 +126,7 @@ def receipt_row(receipt) -> rx.Component:
         ),
         rx.el.td(
             rx.el.div(
-                receipt.date.split("T")[0],
+                receipt.day,
                 class_name="text-sm font-medium text-gray-900",
             ),
             rx.el.div(receipt.reference_id, class_name="text-xs text-gray-500"),
@@ -81,7 +147,7 @@ def receipt_row(receipt) -> rx.Component:
             class_name="px-6 py-4 whitespace-nowrap",
         ),
         rx.el.td(
-            f"${receipt.amount:,.2f}",
+            f"${receipt.amount_cents / 100:,.2f}",
             class_name="px-6 py-4 whitespace-nowrap text-sm font-semibold text-indigo-600",
         ),
         rx.el.td(
@@ -119,7 +185,11 @@ def receipt_row(receipt) -> rx.Component:
 def pagination_controls() -> rx.Component:
     return rx.el.div(
         rx.el.p(
-            f"Showing page {ReceiptState.page} of {ReceiptState.total_pages}",
+            rx.cond(
+                ReceiptState.count_capped,
+                f"Showing page {ReceiptState.page} of {ReceiptState.total_pages}+",
+                f"Showing page {ReceiptState.page} of {ReceiptState.total_pages}",
+            ),
             class_name="text-sm text-gray-700",
         ),
         rx.el.div(
@@ -132,7 +202,7 @@ def pagination_controls() -> rx.Component:
             rx.el.button(
                 rx.icon("chevron-right", class_name="h-5 w-5"),
                 on_click=ReceiptState.next_page,
-                disabled=ReceiptState.page >= ReceiptState.total_pages,
+                disabled=~ReceiptState.has_next_page,
                 class_name="p-2 border border-gray-300 rounded-lg hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed transition-colors",
             ),
             class_name="flex gap-2",
@@ -154,11 +224,11 @@ def receipts_list_page() -> rx.Component:
                 ),
                 rx.el.div(
                     rx.cond(
-                        ReceiptState.selected_receipt_ids.length() > 0,
+                        ReceiptState.selection_count > 0,
                         rx.el.a(
                             rx.el.button(
                                 rx.icon("printer", class_name="h-5 w-5 mr-2"),
-                                f"Print Selected ({ReceiptState.selected_receipt_ids.length()})",
+                                f"Print Selected ({ReceiptState.selection_count})",
                                 class_name="inline-flex items-center px-4 py-2 bg-gray-800 text-white rounded-xl font-medium hover:bg-gray-900 shadow-sm hover:shadow transition-all mr-4",
                             ),
                             href="/receipts/batch-print",
@@ -178,6 +248,7 @@ def receipts_list_page() -> rx.Component:
                 class_name="flex justify-between items-center mb-8",
             ),
             filter_controls(),
+            bulk_actions(),
             rx.el.div(
                 rx.el.div(
                     rx.el.table(
@@ -186,7 +257,10 @@ def receipts_list_page() -> rx.Component:
                                 rx.el.th(
                                     rx.el.input(
                                         type="checkbox",
-                                        on_change=lambda v: ReceiptState.select_all_current(),
+                                        checked=ReceiptState.page_all_selected,
+                                        on_change=lambda v: (
+                                            ReceiptState.select_all_current()
+                                        ),
                                         class_name="rounded border-gray-300 text-indigo-600 focus:ring-indigo-500",
                                     ),
                                     class_name="px-6 py-3 text-left",
@@ -235,6 +309,13 @@ def receipts_list_page() -> rx.Component:
                 on_confirm=ReceiptState.delete_receipt,
                 on_cancel=ReceiptState.cancel_delete,
             ),
+            delete_confirmation_modal(
+                is_open=ReceiptState.is_bulk_delete_modal_open,
+                on_confirm=ReceiptState.delete_selected,
+                on_cancel=ReceiptState.cancel_bulk_delete,
+                title="Delete Selected Receipts",
+                message="Are you sure you want to delete the selected receipts? This action cannot be undone.",
+            ),
             class_name="w-full pb-20",
         )
     )
\ No newline at end of file
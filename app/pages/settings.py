@@ -30,6 +30,14 @@ def settings_input(
     )
 
 
+def cache_stat(label: str, value) -> rx.Component:
+    return rx.el.div(
+        rx.el.p(label, class_name="text-sm text-gray-500"),
+        rx.el.p(value, class_name="text-xl font-bold text-gray-900"),
+        class_name="flex flex-col",
+    )
+
+
 def pin_modal() -> rx.Component:
     return rx.cond(
         SettingsState.show_pin_modal,
@@ -139,8 +147,28 @@ def settings_page() -> rx.Component:
                             class_name="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors text-gray-700 font-medium",
                         ),
                         rx.el.div(
+                            rx.upload(
+                                rx.el.button(
+                                    rx.icon("upload", class_name="h-5 w-5 mr-2"),
+                                    "Restore / Import",
+                                    class_name="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors text-gray-700 font-medium",
+                                ),
+                                id="restore_upload",
+                                accept={
+                                    "application/gzip": [".gz"],
+                                    "application/json": [".json", ".jsonl"],
+                                    "text/csv": [".csv"],
+                                },
+                                max_files=1,
+                                no_drag=True,
+                                on_drop=ReceiptState.restore_backup(
+                                    rx.upload_files(upload_id="restore_upload")
+                                ),
+                                border="none",
+                                padding="0",
+                            ),
                             rx.el.p(
-                                "Restore feature coming soon",
+                                "Backups (.jsonl.gz, .json) or receipt CSV exports",
                                 class_name="text-xs text-gray-400 italic mt-2",
                             ),
                             class_name="flex flex-col items-center",
@@ -186,6 +214,23 @@ def settings_page() -> rx.Component:
                     ),
                 ),
             ),
+            settings_section(
+                "Analytics Cache",
+                rx.el.div(
+                    rx.el.div(
+                        cache_stat("Hits", SettingsState.cache_stats["hits"]),
+                        cache_stat("Misses", SettingsState.cache_stats["misses"]),
+                        cache_stat("Hit Rate", SettingsState.cache_hit_rate),
+                        cache_stat("Entries", SettingsState.cache_stats["entries"]),
+                        class_name="grid grid-cols-2 md:grid-cols-4 gap-4 mb-4",
+                    ),
+                    rx.el.button(
+                        "Refresh",
+                        on_click=SettingsState.load_cache_stats,
+                        class_name="text-sm font-medium text-indigo-600 hover:text-indigo-700",
+                    ),
+                ),
+            ),
             class_name="w-full max-w-4xl mx-auto pb-20",
         )
     )
\ No newline at end of file
@@ -58,13 +58,19 @@ def view_receipt_page() -> rx.Component:
                     class_name="no-print",
                 ),
                 rx.el.div(
+                    rx.el.button(
+                        rx.icon("file-down", class_name="h-5 w-5 mr-2"),
+                        "Download PDF",
+                        on_click=ReceiptState.download_receipt_pdf("a4"),
+                        class_name="flex items-center px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors text-gray-700",
+                    ),
                     rx.el.button(
                         rx.icon("printer", class_name="h-5 w-5 mr-2"),
                         "Print Receipt",
                         on_click=rx.call_script("window.print()"),
                         class_name="flex items-center px-4 py-2 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 transition-colors shadow-sm",
                     ),
-                    class_name="no-print",
+                    class_name="no-print flex gap-3",
                 ),
                 class_name="flex justify-between items-center mb-8",
             ),
@@ -201,7 +207,7 @@ def view_receipt_page() -> rx.Component:
                                         class_name="text-xs font-bold text-white/80 tracking-wider",
                                     ),
                                     rx.el.h3(
-                                        f"${ReceiptState.selected_receipt.amount:,.2f}",
+                                        f"${ReceiptState.selected_receipt.amount_cents / 100:,.2f}",
                                         class_name="text-3xl font-bold text-white mt-1",
                                     ),
                                     class_name="flex flex-col",
@@ -1,30 +1,285 @@
 import reflex as rx
 from typing import Optional
-from app.db import Receipt
-from sqlmodel import select, col, or_, desc, func
-import random
+from app.db import Receipt, ReceiptRollup, SubmissionKey
+from sqlmodel import select, col, desc, func, tuple_
+import sqlalchemy
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.utils.search import (
+    SEARCH_RANK_LIMIT,
+    build_match_query,
+    limited_matches,
+    receipt_fts,
+    search_condition,
+    substring_terms,
+)
+from app.utils.money import to_cents, to_float
+from app.utils.broadcast import FEED_POLL_SECONDS, ReceiptChange, receipt_feed
+from app.utils.cache import analytics_cache, current_write_version
+from app.utils.references import allocate_reference
+from app.utils.retry import retry_on_lock
+from decimal import InvalidOperation
 from datetime import datetime, timedelta
+import asyncio
+import dataclasses
+import json
 import math
 import logging
+import time
+import uuid
+
+SUBMISSION_KEY_TTL = timedelta(days=1)
+WATCHED_PATHS = ("/", "/receipts")
+WATCH_LEASE_SECONDS = 300
+
+
+@dataclasses.dataclass(slots=True)
+class ReceiptRow:
+    """The receipt columns shown in the list and dashboard tables."""
+
+    id: int
+    reference_id: str
+    day: str
+    student_name: str
+    admission_number: str
+    class_grade: str
+    amount_cents: int
+    payment_method: str
+
+
+ROW_COLUMNS = [getattr(Receipt, f.name) for f in dataclasses.fields(ReceiptRow)]
+
+
+def _receipt_row(values: dict) -> ReceiptRow:
+    """Project a receipt's column values onto a list row."""
+    return ReceiptRow(
+        **{f.name: values[f.name] for f in dataclasses.fields(ReceiptRow)}
+    )
+
+
+def _filter_conditions(class_grade: str, date_start: str, date_end: str) -> list:
+    """Build the WHERE clauses for a class and date range."""
+    conditions = []
+    if class_grade:
+        conditions.append(Receipt.class_grade == class_grade)
+    if date_start:
+        conditions.append(Receipt.day >= date_start)
+    if date_end:
+        conditions.append(Receipt.day <= date_end)
+    return conditions
+
+
+def _query_dashboard_stats(session, since_month: str) -> dict:
+    """Aggregate dashboard totals and chart buckets from the rollup table."""
+    total, count = session.exec(
+        select(
+            func.sum(ReceiptRollup.total_cents),
+            func.sum(ReceiptRollup.receipt_count),
+        )
+    ).one()
+    students = session.exec(
+        select(func.count(func.distinct(Receipt.admission_number)))
+    ).one()
+    month = func.substr(ReceiptRollup.day, 1, 7)
+    monthly = session.exec(
+        select(month, func.sum(ReceiptRollup.total_cents))
+        .where(ReceiptRollup.day >= since_month)
+        .group_by(month)
+    ).all()
+    by_class = session.exec(
+        select(ReceiptRollup.class_grade, func.sum(ReceiptRollup.total_cents))
+        .group_by(ReceiptRollup.class_grade)
+        .order_by(ReceiptRollup.class_grade)
+    ).all()
+    return {
+        "total": total or 0,
+        "count": count or 0,
+        "students": students or 0,
+        "monthly": [tuple(row) for row in monthly],
+        "by_class": [tuple(row) for row in by_class],
+    }
+
+
+def _find_submission(submission_key: str) -> Optional[tuple[int, str]]:
+    """Return the receipt already saved under a submission key, if any."""
+    with rx.session() as session:
+        row = session.exec(
+            select(SubmissionKey.receipt_id, SubmissionKey.reference_id).where(
+                SubmissionKey.key == submission_key,
+                SubmissionKey.expires_at >= datetime.now().isoformat(),
+            )
+        ).first()
+    return tuple(row) if row else None
+
+
+def _claim_submission(connection, submission_key: str) -> Optional[tuple[int, str]]:
+    """Record a submission key, or return the receipt saved under it before."""
+    now = datetime.now()
+    connection.execute(
+        sqlalchemy.delete(SubmissionKey).where(
+            SubmissionKey.expires_at < now.isoformat()
+        )
+    )
+    claimed = connection.execute(
+        sqlite_insert(SubmissionKey)
+        .values(key=submission_key, expires_at=(now + SUBMISSION_KEY_TTL).isoformat())
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    if claimed.rowcount:
+        return None
+    row = connection.execute(
+        select(SubmissionKey.receipt_id, SubmissionKey.reference_id).where(
+            SubmissionKey.key == submission_key
+        )
+    ).first()
+    return tuple(row)
+
+
+@retry_on_lock
+def _insert_receipt(
+    values: dict, submission_key: str = ""
+) -> Optional[tuple[int, str, bool]]:
+    """Insert a receipt and return its id, reference and whether it existed."""
+    with rx.session() as session:
+        connection = session.connection()
+        if submission_key:
+            prior = _claim_submission(connection, submission_key)
+            if prior:
+                return (*prior, True)
+        for resync in (False, True):
+            reference_id = values["reference_id"] or allocate_reference(
+                connection, values["day"], resync=resync
+            )
+            try:
+                with session.begin_nested():
+                    receipt = Receipt(**dict(values, reference_id=reference_id))
+                    session.add(receipt)
+            except sqlalchemy.exc.IntegrityError:
+                if values["reference_id"]:
+                    return None
+                continue
+            if submission_key:
+                connection.execute(
+                    sqlalchemy.update(SubmissionKey)
+                    .where(SubmissionKey.key == submission_key)
+                    .values(receipt_id=receipt.id, reference_id=reference_id)
+                )
+            receipt_id = receipt.id
+            version = current_write_version(session)
+            count = _student_receipt_count(session, values["admission_number"])
+            session.commit()
+            row = dict(values, id=receipt_id, reference_id=reference_id)
+            receipt_feed.publish("insert", row, version, int(count == 1))
+            return receipt_id, reference_id, False
+        return None
+
+
+@retry_on_lock
+def _delete_receipt(reference_id: str) -> Optional[dict]:
+    """Delete the receipt with the given reference and return its values."""
+    with rx.session() as session:
+        row = session.exec(
+            sqlalchemy.delete(Receipt)
+            .where(Receipt.reference_id == reference_id)
+            .returning(*Receipt.__table__.columns)
+        ).first()
+        if not row:
+            return None
+        version = current_write_version(session)
+        count = _student_receipt_count(session, row.admission_number)
+        session.commit()
+    receipt_feed.publish("delete", dict(row._mapping), version, -int(count == 0))
+    return dict(row._mapping)
+
+
+def _references_in(refs: list[str]) -> sqlalchemy.Select:
+    """Select the given references from a single JSON parameter."""
+    values = func.json_each(json.dumps(refs)).table_valued("value")
+    return sqlalchemy.select(values.c.value)
+
+
+@retry_on_lock
+def _delete_receipts(condition) -> int:
+    """Delete every receipt matching a condition in one statement."""
+    with rx.session() as session:
+        result = session.connection().execute(
+            sqlalchemy.delete(Receipt).where(condition)
+        )
+        version = current_write_version(session)
+        session.commit()
+    receipt_feed.publish("reload", None, version)
+    return result.rowcount
+
+
+@retry_on_lock
+def _reassign_class(condition, class_grade: str) -> int:
+    """Move every receipt matching a condition to another class."""
+    with rx.session() as session:
+        result = session.connection().execute(
+            sqlalchemy.update(Receipt).where(condition).values(class_grade=class_grade)
+        )
+        version = current_write_version(session)
+        session.commit()
+    receipt_feed.publish("reload", None, version)
+    return result.rowcount
+
+
+def _backup_file(settings: dict, filename: str) -> str:
+    """Write a backup of every receipt on its own session."""
+    from app.utils.export import EXPORT_CHUNK_ROWS, write_json_backup
+
+    columns = list(Receipt.__table__.columns.keys())
+    query = sqlalchemy.select(Receipt.__table__).order_by(Receipt.id)
+    with rx.session() as session:
+        connection = session.connection().execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        rows = connection.execute(query)
+        return write_json_backup(columns, rows, settings, filename)
+
+
+def _restore_file(raw, filename: str):
+    """Restore an uploaded backup on its own connection."""
+    from app.utils.restore import restore_backup
+
+    with rx.session() as session:
+        engine = session.get_bind()
+    try:
+        with engine.connect() as connection:
+            return restore_backup(connection, raw, filename)
+    finally:
+        with rx.session() as session:
+            receipt_feed.publish("reload", None, current_write_version(session))
+
+
+def _student_receipt_count(session, admission_number: str) -> int:
+    """Count a student's receipts, stopping at two."""
+    query = select(Receipt.id).where(Receipt.admission_number == admission_number)
+    return len(session.exec(query.limit(2)).all())
 
 
 class ReceiptState(rx.State):
     """Manages receipt data, filtering, search, and pagination."""
 
-    receipts: list[Receipt] = []
-    all_receipts: list[Receipt] = []
+    receipts: list[ReceiptRow] = []
+    print_receipts: list[Receipt] = []
     total_count: int = 0
+    count_capped: bool = False
     search_query: str = ""
     filter_class: str = ""
     filter_date_start: str = ""
     filter_date_end: str = ""
     page: int = 1
     page_size: int = 5
+    _first_cursor: list = []
+    _last_cursor: list = []
+    _total_cents: int = 0
     total_collected_val: float = 0.0
     receipts_count_val: int = 0
     active_students_count_val: int = 0
     monthly_stats_data: list[dict[str, str | float]] = []
     class_stats_data: list[dict[str, str | float]] = []
+    _feed_seq: int = -1
+    _stats_version: int = -1
+    _list_version: int = -1
+    _watching: bool = False
 
     @rx.var
     def total_collected(self) -> float:
@@ -47,9 +302,23 @@ class ReceiptState(rx.State):
         return max(1, math.ceil(self.total_count / self.page_size))
 
     @rx.var
-    def current_receipts(self) -> list[Receipt]:
+    def total_count_label(self) -> str:
+        return f"{self.total_count}+" if self.count_capped else str(self.total_count)
+
+    @rx.var
+    def has_next_page(self) -> bool:
+        if self.count_capped:
+            return len(self.receipts) >= self.page_size
+        return self.page < self.total_pages
+
+    @rx.var
+    def current_receipts(self) -> list[ReceiptRow]:
         return self.receipts
 
+    @rx.var
+    def page_all_selected(self) -> bool:
+        return bool(self.receipts) and len(self.page_selected) == len(self.receipts)
+
     @rx.var
     def monthly_stats(self) -> list[dict[str, str | float]]:
         return self.monthly_stats_data
@@ -58,119 +327,347 @@ class ReceiptState(rx.State):
     def class_stats(self) -> list[dict[str, str | float]]:
         return self.class_stats_data
 
-    def _seed_database(self):
-        """Seed database with sample data if empty."""
-        with rx.session() as session:
-            if session.exec(select(Receipt)).first():
-                return
-            logging.info("Seeding database with sample receipts...")
-            classes = ["GRADE 1", "GRADE 2", "GRADE 3", "PP1", "PP2"]
-            methods = ["Cash", "Bank Transfer", "Mobile Money"]
-            names = [
-                "John Doe",
-                "Jane Smith",
-                "Alice Jones",
-                "Bob Brown",
-                "Charlie Davis",
-            ]
-            for i in range(15):
-                date_offset = random.randint(0, 60)
-                r_date = (datetime.now() - timedelta(days=date_offset)).isoformat()
-                receipt = Receipt(
-                    student_name=random.choice(names),
-                    admission_number=f"ADM{1000 + i}",
-                    class_grade=random.choice(classes),
-                    payer_name="Parent",
-                    amount=float(random.randint(100, 5000)),
-                    payment_method=random.choice(methods),
-                    reference_id=f"REF{random.randint(100000, 999999)}",
-                    date=r_date,
-                    created_at=datetime.now().isoformat(),
-                    notes="Sample receipt",
-                )
-                session.add(receipt)
-            session.commit()
-
     @rx.event
     def load_stats(self):
         """Load global stats from DB."""
         try:
+            self._stats_version = self._feed_version()
+            stats = {}
+            today = datetime.now()
+            for i in range(11, -1, -1):
+                d = today - timedelta(days=i * 30)
+                stats[d.strftime("%Y-%m")] = 0
             with rx.session() as session:
-                total = session.exec(select(func.sum(Receipt.amount))).one_or_none()
-                self.total_collected_val = float(total) if total else 0.0
-                self.receipts_count_val = (
-                    session.exec(select(func.count(Receipt.id))).one() or 0
+                data = analytics_cache.get_or_load(
+                    session,
+                    ("dashboard", min(stats)),
+                    lambda s: _query_dashboard_stats(s, min(stats)),
                 )
-                self.active_students_count_val = len(
-                    session.exec(select(Receipt.admission_number).distinct()).all()
-                )
-                all_recs = session.exec(select(Receipt)).all()
-                self.all_receipts = all_recs
-                stats = {}
-                today = datetime.now()
-                for i in range(11, -1, -1):
-                    d = today - timedelta(days=i * 30)
-                    key = d.strftime("%b %Y")
-                    stats[key] = 0.0
-                for r in all_recs:
-                    try:
-                        d = datetime.fromisoformat(r.date)
-                        key = d.strftime("%b %Y")
-                        if key in stats:
-                            stats[key] += r.amount
-                    except Exception as e:
-                        logging.exception(f"Error parsing receipt date: {e}")
-                        continue
-                self.monthly_stats_data = [
-                    {"month": m, "amount": amt} for m, amt in stats.items()
-                ]
-                c_stats = {}
-                for r in all_recs:
-                    if r.class_grade in c_stats:
-                        c_stats[r.class_grade] += r.amount
-                    else:
-                        c_stats[r.class_grade] = r.amount
-                c_result = [{"name": k, "amount": v} for k, v in c_stats.items()]
-                c_result.sort(key=lambda x: x["name"])
-                self.class_stats_data = c_result
+            self._total_cents = data["total"]
+            self.total_collected_val = to_float(data["total"])
+            self.receipts_count_val = data["count"]
+            self.active_students_count_val = data["students"]
+            for key, amount in data["monthly"]:
+                if key in stats:
+                    stats[key] += amount
+            self.monthly_stats_data = [
+                {
+                    "month": datetime.strptime(m, "%Y-%m").strftime("%b %Y"),
+                    "amount": to_float(amt),
+                }
+                for m, amt in stats.items()
+            ]
+            self.class_stats_data = [
+                {"name": name, "amount": to_float(amount)}
+                for name, amount in data["by_class"]
+            ]
         except Exception as e:
             logging.exception(f"Error loading stats: {e}")
+            self._total_cents = 0
             self.total_collected_val = 0.0
             self.receipts_count_val = 0
             self.active_students_count_val = 0
-            self.all_receipts = []
             self.monthly_stats_data = []
             self.class_stats_data = []
 
     @rx.event
-    def load_receipts(self):
-        """Fetch receipts from database with filters applied."""
+    def load_print_receipts(self):
+        """Load only the selected receipts, newest first, for printing."""
+        if not self.selection_count:
+            self.print_receipts = []
+            return
         try:
-            query = select(Receipt).order_by(desc(Receipt.date))
-            if self.search_query:
-                sq = f"%{self.search_query.lower()}%"
-                query = query.where(
-                    or_(
-                        col(Receipt.student_name).contains(self.search_query),
-                        col(Receipt.admission_number).contains(self.search_query),
-                        col(Receipt.reference_id).contains(self.search_query),
+            with rx.session() as session:
+                self.print_receipts = list(
+                    session.exec(
+                        select(Receipt)
+                        .where(self._selection_condition())
+                        .order_by(desc(Receipt.day), desc(Receipt.id))
                     )
                 )
-            if self.filter_class:
-                query = query.where(Receipt.class_grade == self.filter_class)
-            if self.filter_date_start:
-                query = query.where(Receipt.date >= self.filter_date_start)
-            if self.filter_date_end:
-                query = query.where(Receipt.date <= self.filter_date_end)
+        except Exception as e:
+            logging.exception(f"Error loading receipts for printing: {e}")
+            self.print_receipts = []
+
+    def _receipt_filters(self) -> list:
+        """Build the WHERE clauses for the class and date filters."""
+        return _filter_conditions(
+            self.filter_class, self.filter_date_start, self.filter_date_end
+        )
+
+    def _fetch_page(self, direction: str = ""):
+        """Fetch the current page, seeking from the cursor when paging."""
+        query = select(*ROW_COLUMNS).where(*self._receipt_filters())
+        match = build_match_query(self.search_query)
+        key = tuple_(Receipt.day, Receipt.id)
+        if match and not self.count_capped:
+            direction = ""
+            if substring_terms(self.search_query):
+                query = query.where(search_condition(Receipt.id, self.search_query))
+                query = query.order_by(desc(Receipt.day), desc(Receipt.id))
+            else:
+                query = query.join(receipt_fts, receipt_fts.c.rowid == Receipt.id)
+                query = query.where(receipt_fts.c.receipt_fts.match(match))
+                query = query.order_by(receipt_fts.c.rank, desc(Receipt.day))
+            query = query.offset((self.page - 1) * self.page_size)
+        else:
+            if match:
+                query = query.where(
+                    search_condition(Receipt.id, self.search_query, broad=True)
+                )
+            if direction == "next" and self._last_cursor:
+                query = query.where(key < tuple(self._last_cursor))
+                query = query.order_by(desc(Receipt.day), desc(Receipt.id))
+            elif direction == "prev" and self._first_cursor:
+                query = query.where(key > tuple(self._first_cursor))
+                query = query.order_by(Receipt.day, Receipt.id)
+            else:
+                direction = ""
+                query = query.order_by(desc(Receipt.day), desc(Receipt.id))
+                query = query.offset((self.page - 1) * self.page_size)
+        with rx.session() as session:
+            rows = [
+                ReceiptRow(*row) for row in session.exec(query.limit(self.page_size))
+            ]
+        if direction == "prev":
+            rows.reverse()
+        self._set_page_rows(rows)
+
+    def _set_page_rows(self, rows: list[ReceiptRow]):
+        """Show rows as the current page and remember its cursors."""
+        self.receipts = rows
+        if rows:
+            self._first_cursor = [rows[0].day, rows[0].id]
+            self._last_cursor = [rows[-1].day, rows[-1].id]
+        else:
+            self._first_cursor = []
+            self._last_cursor = []
+        self._sync_page_selection()
+
+    def _count_receipts(self):
+        """Count rows matching the current filters, capped for broad searches."""
+        self.count_capped = False
+        if not build_match_query(self.search_query):
+            query = select(func.count()).select_from(Receipt)
             with rx.session() as session:
-                self.total_count = len(session.exec(query).all())
-                start = (self.page - 1) * self.page_size
-                query = query.offset(start).limit(self.page_size)
-                self.receipts = session.exec(query).all()
+                self.total_count = session.exec(
+                    query.where(*self._receipt_filters())
+                ).one()
+            return
+        matches = limited_matches(
+            Receipt.__table__,
+            self.search_query,
+            self._receipt_filters(),
+            SEARCH_RANK_LIMIT + 1,
+        )
+        with rx.session() as session:
+            count = session.exec(
+                select(func.count()).select_from(matches.subquery())
+            ).one()
+        self.count_capped = count > SEARCH_RANK_LIMIT
+        self.total_count = min(count, SEARCH_RANK_LIMIT)
+
+    @rx.event
+    def load_receipts(self):
+        """Fetch receipts from database with filters applied."""
+        try:
+            self._list_version = self._feed_version()
+            self._count_receipts()
+            self._fetch_page()
         except Exception as e:
             logging.exception(f"Error loading receipts: {e}")
             self.receipts = []
             self.total_count = 0
+            self.count_capped = False
+
+    def _turn_page(self, direction: str):
+        try:
+            self._fetch_page(direction)
+        except Exception as e:
+            logging.exception(f"Error loading receipts: {e}")
+            self.receipts = []
+
+    def _matches_filters(self, row: dict) -> bool:
+        """Whether a receipt passes the class and date filters."""
+        return (
+            (not self.filter_class or row["class_grade"] == self.filter_class)
+            and (not self.filter_date_start or row["day"] >= self.filter_date_start)
+            and (not self.filter_date_end or row["day"] <= self.filter_date_end)
+        )
+
+    def _apply_stats_delta(self, row: dict, sign: int, students: int = 0):
+        """Add (sign=1) or remove (sign=-1) one receipt from the dashboard stats."""
+        if not self.monthly_stats_data:
+            return
+        cents = sign * row["amount_cents"]
+        self._total_cents += cents
+        self.total_collected_val = to_float(self._total_cents)
+        self.receipts_count_val += sign
+        self.active_students_count_val += students
+        try:
+            month = datetime.strptime(row["day"][:7], "%Y-%m").strftime("%b %Y")
+        except ValueError:
+            month = None
+        self.monthly_stats_data = [
+            {**m, "amount": to_float(to_cents(m["amount"]) + cents)}
+            if m["month"] == month
+            else m
+            for m in self.monthly_stats_data
+        ]
+        by_class = {c["name"]: to_cents(c["amount"]) for c in self.class_stats_data}
+        by_class[row["class_grade"]] = by_class.get(row["class_grade"], 0) + cents
+        self.class_stats_data = [
+            {"name": name, "amount": to_float(amount)}
+            for name, amount in sorted(by_class.items())
+            if amount > 0
+        ]
+
+    def _apply_insert_to_page(self, row: dict):
+        """Place a new receipt on the visible page if it belongs there."""
+        if build_match_query(self.search_query):
+            self.load_receipts()
+            return
+        if not self._matches_filters(row):
+            return
+        self.total_count += 1
+        key = (row["day"], row["id"])
+        if self.page > 1 and (not self.receipts or key > tuple(self._first_cursor)):
+            self._fetch_page()
+            return
+        if len(self.receipts) >= self.page_size and key < tuple(self._last_cursor):
+            return
+        if any(r.id == row["id"] for r in self.receipts):
+            return
+        rows = sorted(
+            [*self.receipts, _receipt_row(row)],
+            key=lambda r: (r.day, r.id),
+            reverse=True,
+        )
+        self._set_page_rows(rows[: self.page_size])
+
+    def _apply_delete_to_page(self, row: dict):
+        """Drop a deleted receipt from the visible page and backfill one row."""
+        if build_match_query(self.search_query):
+            self.load_receipts()
+            return
+        if not self._matches_filters(row):
+            return
+        self.total_count -= 1
+        rows = [r for r in self.receipts if r.id != row["id"]]
+        if len(rows) == len(self.receipts):
+            if self.page > 1 and self.receipts:
+                if (row["day"], row["id"]) > tuple(self._first_cursor):
+                    self._fetch_page()
+            return
+        if not rows and self.page > 1:
+            self.page -= 1
+            self._fetch_page()
+            return
+        if len(self.receipts) == self.page_size:
+            query = (
+                select(*ROW_COLUMNS)
+                .where(*self._receipt_filters())
+                .where(tuple_(Receipt.day, Receipt.id) < tuple(self._last_cursor))
+                .order_by(desc(Receipt.day), desc(Receipt.id))
+                .limit(1)
+            )
+            with rx.session() as session:
+                rows.extend(ReceiptRow(*row) for row in session.exec(query))
+        self._set_page_rows(rows)
+
+    def _feed_version(self) -> int:
+        """Data version a full load starts from, following the feed from here."""
+        if self._feed_seq < 0:
+            self._feed_seq = receipt_feed.seq
+        with rx.session() as session:
+            return current_write_version(session)
+
+    def _reload_views(self):
+        if self.monthly_stats_data:
+            self.load_stats()
+        self.load_receipts()
+
+    def _apply_feed(self):
+        """Apply receipt changes committed since this session last looked."""
+        if self._feed_seq < 0:
+            self._feed_seq = receipt_feed.seq
+            return
+        changes = receipt_feed.since(self._feed_seq)
+        if changes is None:
+            self._feed_seq = receipt_feed.seq
+            self._reload_views()
+            return
+        for change in changes:
+            self._feed_seq = change.seq
+            try:
+                if change.kind == "delete":
+                    self._unselect_deleted(change.row["reference_id"])
+                self._apply_change(change)
+            except Exception as e:
+                logging.exception(f"Error applying receipt change {change.seq}: {e}")
+
+    def _apply_change(self, change: ReceiptChange):
+        """Bring the stats and the list up to one committed change."""
+        sign = 1 if change.kind == "insert" else -1
+        delta = change.kind != "reload"
+        if self.monthly_stats_data and change.version > self._stats_version:
+            if delta and change.version == self._stats_version + 1:
+                self._stats_version = change.version
+                self._apply_stats_delta(change.row, sign, change.students)
+            else:
+                self.load_stats()
+        if self._list_version >= 0 and change.version > self._list_version:
+            if delta and change.version == self._list_version + 1:
+                self._list_version = change.version
+                if sign > 0:
+                    self._apply_insert_to_page(change.row)
+                else:
+                    self._apply_delete_to_page(change.row)
+            else:
+                self.load_receipts()
+
+    def _check_other_writers(self):
+        """Reload any view behind the database, e.g. after another process wrote."""
+        with rx.session() as session:
+            version = current_write_version(session)
+        if self.monthly_stats_data and version > self._stats_version:
+            self.load_stats()
+        if self._list_version >= 0 and version > self._list_version:
+            self.load_receipts()
+
+    def _on_watched_page(self) -> bool:
+        """Whether the client's current page shows live receipts."""
+        return (self.router.url.path.rstrip("/") or "/") in WATCHED_PATHS
+
+    @rx.event(background=True)
+    async def watch_receipts(self):
+        """Push receipts saved or deleted by anyone into this session's views."""
+        async with self:
+            if self._watching:
+                return
+            self._watching = True
+        renew = False
+        try:
+            deadline = time.monotonic() + WATCH_LEASE_SECONDS
+            while time.monotonic() < deadline:
+                async with self:
+                    if not self._on_watched_page():
+                        return
+                    seq = self._feed_seq
+                await receipt_feed.wait(seq, FEED_POLL_SECONDS)
+                async with self:
+                    try:
+                        self._apply_feed()
+                        self._check_other_writers()
+                    except Exception as e:
+                        logging.exception(f"Error updating watched receipts: {e}")
+            renew = True
+        finally:
+            async with self:
+                self._watching = False
+        if renew:
+            # Renewed through the client, so a closed tab ends the watcher.
+            yield ReceiptState.watch_receipts
 
     @rx.event
     def set_search_query(self, query: str):
@@ -185,23 +682,19 @@ class ReceiptState(rx.State):
 
     @rx.event
     def next_page(self):
-        if self.page < self.total_pages:
+        if self.has_next_page:
             self.page += 1
-            self.load_receipts()
+            self._turn_page("next")
 
     @rx.event
     def prev_page(self):
         if self.page > 1:
             self.page -= 1
-            self.load_receipts()
+            self._turn_page("prev")
 
     @rx.event
     def on_mount(self):
-        from app.db_init import initialize_db
-
         try:
-            initialize_db()
-            self._seed_database()
             self.load_stats()
             self.load_receipts()
         except Exception as e:
@@ -218,70 +711,332 @@ class ReceiptState(rx.State):
     new_date: str = datetime.now().isoformat().split("T")[0]
     new_notes: str = ""
     view_receipt_id: str = ""
+    submission_key: str = ""
+    selected_receipt: Optional[Receipt] = None
     is_delete_modal_open: bool = False
     receipt_to_delete_id: str = ""
-    selected_receipt_ids: list[str] = []
+    select_all_matching: bool = False
+    selection_count: int = 0
+    page_selected: list[str] = []
+    _picked: set[str] = set()
+    _excluded: set[str] = set()
+    _selection_filters: dict = {}
+
+    def _sync_page_selection(self):
+        """Work out which rows on the current page are selected."""
+        if not self.select_all_matching:
+            self.page_selected = [
+                r.reference_id for r in self.receipts if r.reference_id in self._picked
+            ]
+            return
+        ids = [r.id for r in self.receipts]
+        if not ids:
+            self.page_selected = []
+            return
+        with rx.session() as session:
+            selected = set(
+                session.exec(
+                    select(Receipt.reference_id).where(
+                        col(Receipt.id).in_(ids), self._selection_condition()
+                    )
+                )
+            )
+        self.page_selected = [
+            r.reference_id for r in self.receipts if r.reference_id in selected
+        ]
+
+    def _select(self, ref_id: str, selected: bool):
+        """Select or deselect one row of the current page."""
+        if (ref_id in self.page_selected) == selected:
+            return
+        if selected:
+            if ref_id in self._excluded:
+                self._excluded.discard(ref_id)
+            else:
+                self._picked.add(ref_id)
+            self.page_selected.append(ref_id)
+            self.selection_count += 1
+        else:
+            if ref_id in self._picked:
+                self._picked.discard(ref_id)
+            else:
+                self._excluded.add(ref_id)
+            self.page_selected.remove(ref_id)
+            self.selection_count -= 1
+
+    def _unselect_deleted(self, ref_id: str):
+        """Keep the selection count right when a receipt is deleted."""
+        if ref_id in self.page_selected:
+            self._select(ref_id, False)
+        elif ref_id in self._picked:
+            self._picked.discard(ref_id)
+            self.selection_count -= 1
+        elif self.select_all_matching:
+            self._count_selection()
 
     @rx.event
     def toggle_selection(self, ref_id: str):
-        if ref_id in self.selected_receipt_ids:
-            self.selected_receipt_ids.remove(ref_id)
-        else:
-            self.selected_receipt_ids.append(ref_id)
+        self._select(ref_id, ref_id not in self.page_selected)
 
     @rx.event
     def select_all_current(self):
-        for r in self.current_receipts:
-            if r.reference_id not in self.selected_receipt_ids:
-                self.selected_receipt_ids.append(r.reference_id)
+        """Select every row on the page, or clear them if all were selected."""
+        selected = len(self.page_selected) < len(self.receipts)
+        for r in self.receipts:
+            self._select(r.reference_id, selected)
+
+    @rx.event
+    def select_all_matching_filters(self):
+        """Select every receipt matching the current search and filters."""
+        with rx.session() as session:
+            max_id = session.exec(select(func.max(Receipt.id))).one()
+        self.select_all_matching = True
+        self._selection_filters = {
+            "class_grade": self.filter_class,
+            "date_start": self.filter_date_start,
+            "date_end": self.filter_date_end,
+            "search": self.search_query,
+            "max_id": max_id or 0,
+        }
+        self._picked = set()
+        self._excluded = set()
+        if self.count_capped:
+            self._count_selection()
+        else:
+            self.selection_count = self.total_count
+        self.page_selected = [r.reference_id for r in self.receipts]
 
     @rx.event
     def clear_selection(self):
-        self.selected_receipt_ids = []
+        self.select_all_matching = False
+        self._selection_filters = {}
+        self._picked = set()
+        self._excluded = set()
+        self.selection_count = 0
+        self.page_selected = []
+
+    bulk_class_grade: str = ""
+    is_bulk_delete_modal_open: bool = False
+
+    def _selection_condition(self):
+        """SQL condition matching the selected receipts."""
+        picked = col(Receipt.reference_id).in_(_references_in(list(self._picked)))
+        if not self.select_all_matching:
+            return picked
+        filters = self._selection_filters
+        conditions = _filter_conditions(
+            filters["class_grade"], filters["date_start"], filters["date_end"]
+        )
+        conditions.append(Receipt.id <= filters["max_id"])
+        search = search_condition(Receipt.id, filters["search"])
+        if search is not None:
+            conditions.append(search)
+        if self._excluded:
+            excluded = _references_in(list(self._excluded))
+            conditions.append(col(Receipt.reference_id).not_in(excluded))
+        return sqlalchemy.or_(picked, sqlalchemy.and_(*conditions))
+
+    def _count_selection(self):
+        """Recount the selection after rows changed underneath it."""
+        if not self.select_all_matching:
+            return
+        with rx.session() as session:
+            self.selection_count = session.exec(
+                select(func.count())
+                .select_from(Receipt)
+                .where(self._selection_condition())
+            ).one()
+
+    def _freeze_selection(self):
+        """Turn a select-all selection into the references it matches now."""
+        if not self.select_all_matching:
+            return
+        with rx.session() as session:
+            refs = set(
+                session.exec(
+                    select(Receipt.reference_id).where(self._selection_condition())
+                )
+            )
+        self.select_all_matching = False
+        self._selection_filters = {}
+        self._excluded = set()
+        self._picked = refs
+        self.selection_count = len(refs)
+
+    def _refresh_after_bulk(self):
+        self.load_stats()
+        self.load_receipts()
+
+    @rx.event
+    def set_bulk_class_grade(self, class_grade: str):
+        self.bulk_class_grade = class_grade
+
+    @rx.event
+    def confirm_bulk_delete(self):
+        self.is_bulk_delete_modal_open = True
+
+    @rx.event
+    def cancel_bulk_delete(self):
+        self.is_bulk_delete_modal_open = False
+
+    @rx.event
+    async def delete_selected(self):
+        """Delete the selected receipts in one transaction."""
+        self.is_bulk_delete_modal_open = False
+        try:
+            count = await _delete_receipts(self._selection_condition())
+        except Exception as e:
+            logging.exception(f"Error deleting selected receipts: {e}")
+            return rx.toast.error("Failed to delete the selected receipts.")
+        self.clear_selection()
+        self._refresh_after_bulk()
+        return rx.toast.success(f"Deleted {count} receipts.")
+
+    @rx.event
+    async def reassign_selected_class(self):
+        """Move the selected receipts to the chosen class in one transaction."""
+        if not self.bulk_class_grade:
+            return rx.toast.error("Choose a class to move the receipts to.")
+        try:
+            self._freeze_selection()
+            count = await _reassign_class(
+                self._selection_condition(), self.bulk_class_grade
+            )
+        except Exception as e:
+            logging.exception(f"Error reassigning selected receipts: {e}")
+            return rx.toast.error("Failed to update the selected receipts.")
+        self._refresh_after_bulk()
+        return rx.toast.success(f"Moved {count} receipts to {self.bulk_class_grade}.")
+
+    @rx.event
+    async def export_selected(self):
+        """Stream the selected receipts to a CSV file and download it."""
+        from app.utils.export import EXPORT_CHUNK_ROWS, export_url, write_query_csv
+
+        query = (
+            select(Receipt)
+            .where(self._selection_condition())
+            .order_by(desc(Receipt.day), desc(Receipt.id))
+            .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        )
+        filename = f"selected_receipts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        try:
+            export_name = await asyncio.to_thread(write_query_csv, query, filename)
+        except Exception as e:
+            logging.exception(f"Error exporting selected receipts: {e}")
+            return rx.toast.error("Failed to export the selected receipts.")
+        return rx.download(url=export_url(export_name), filename=filename)
 
     @rx.event
     async def export_backup(self):
-        from app.utils.export import generate_json_backup
+        """Stream every receipt into a compressed backup file and download it."""
+        from app.utils.export import export_url
         from app.states.settings_state import SettingsState
 
         settings_state = await self.get_state(SettingsState)
         settings_dict = settings_state.get_settings_dict()
-        with rx.session() as session:
-            all_data = session.exec(select(Receipt)).all()
-            json_data = generate_json_backup(all_data, settings_dict)
-            return rx.download(data=json_data, filename="toya_backup.json")
+        filename = f"toya_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        try:
+            export_name = await asyncio.to_thread(_backup_file, settings_dict, filename)
+        except Exception as e:
+            logging.exception(f"Error exporting backup: {e}")
+            return rx.toast.error("Failed to export backup.")
+        return rx.download(url=export_url(export_name), filename=filename)
 
-    @rx.var
-    def selected_receipt(self) -> Optional[Receipt]:
-        """Get receipt by view_receipt_id."""
-        if not self.view_receipt_id:
-            return None
-        for r in self.receipts:
-            if r.reference_id == self.view_receipt_id:
-                return r
-        with rx.session() as session:
-            return session.exec(
-                select(Receipt).where(Receipt.reference_id == self.view_receipt_id)
-            ).first()
+    @rx.event
+    async def restore_backup(self, files: list[rx.UploadFile]):
+        """Upsert receipts and settings from an uploaded backup or CSV."""
+        from app.states.settings_state import SettingsState
+
+        if not files:
+            return rx.toast.error("Choose a backup or CSV file to restore.")
+        upload = files[0]
+        try:
+            result = await asyncio.to_thread(
+                _restore_file, upload.file, upload.filename or ""
+            )
+        except (ValueError, KeyError, InvalidOperation) as e:
+            logging.exception(f"Invalid backup file: {e}")
+            return rx.toast.error(f"Could not read backup file: {e}")
+        except Exception as e:
+            logging.exception(f"Error restoring backup: {e}")
+            return rx.toast.error("Failed to restore backup.")
+        if result.settings:
+            settings_state = await self.get_state(SettingsState)
+            settings_state.on_mount()
+        self.load_stats()
+        self.load_receipts()
+        return rx.toast.success(
+            f"Restored {result.rows:,} receipts ({result.rows_per_second:,.0f} rows/s)."
+        )
+
+    async def _download_pdf(self, receipts: list[Receipt], layout: str, filename: str):
+        """Render receipts to a PDF on the process pool and download it."""
+        from app.utils.export import export_path, export_url
+        from app.utils.number_to_words import amounts_to_words
+        from app.utils.pdf import receipt_payload, render_receipts_pdf
+        from app.states.settings_state import SettingsState
+
+        if not receipts:
+            return rx.toast.error("No receipts to print.")
+        settings = await self.get_state(SettingsState)
+        school = {
+            "school_name": settings.school_name,
+            "school_motto": settings.school_motto,
+            "school_address": settings.school_address,
+            "school_phone": settings.school_phone,
+            "school_email": settings.school_email,
+        }
+        symbol = settings.currency_symbol
+        words = amounts_to_words((r.amount_cents for r in receipts), symbol)
+        payloads = [receipt_payload(r, symbol, words[r.amount_cents]) for r in receipts]
+        path, export_name = export_path(filename)
+        try:
+            with open(path, "wb") as output:
+                await asyncio.to_thread(
+                    render_receipts_pdf, payloads, school, output, layout
+                )
+        except Exception as e:
+            logging.exception(f"Error rendering receipts PDF: {e}")
+            path.unlink(missing_ok=True)
+            return rx.toast.error("Failed to generate PDF.")
+        return rx.download(url=export_url(export_name), filename=filename)
+
+    @rx.event
+    async def download_batch_pdf(self, layout: str = "a4"):
+        """Download the selected receipts as one PDF."""
+        filename = f"receipts_{layout}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        return await self._download_pdf(self.print_receipts, layout, filename)
+
+    @rx.event
+    async def download_receipt_pdf(self, layout: str = "a4"):
+        """Download the receipt on the view page as a PDF."""
+        receipt = self.selected_receipt
+        receipts = [receipt] if receipt else []
+        filename = f"receipt_{self.view_receipt_id}_{layout}.pdf"
+        return await self._download_pdf(receipts, layout, filename)
 
     @rx.var
     def selected_receipt_qr(self) -> str:
-        """Generate QR code for selected receipt."""
-        if not self.selected_receipt:
+        """Cached SVG QR code for the selected receipt."""
+        receipt = self.selected_receipt
+        if not receipt:
             return ""
-        from app.utils.qr_code import generate_qr_code
+        from app.utils.qr_code import receipt_qr_code
 
-        data = f"TOYA-REC:{self.selected_receipt.reference_id}|AMT:{self.selected_receipt.amount}|DATE:{self.selected_receipt.date}"
-        return generate_qr_code(data)
+        return receipt_qr_code(receipt.reference_id, receipt.amount_cents, receipt.date)
 
     @rx.var
-    def selected_receipt_words(self) -> str:
-        """Convert amount to words."""
-        if not self.selected_receipt:
+    async def selected_receipt_words(self) -> str:
+        """Amount in words, in the currency configured in settings."""
+        receipt = self.selected_receipt
+        if not receipt:
             return ""
         from app.utils.number_to_words import amount_to_words
+        from app.states.settings_state import SettingsState
 
-        return amount_to_words(self.selected_receipt.amount)
+        settings = await self.get_state(SettingsState)
+        return amount_to_words(receipt.amount_cents, settings.currency_symbol)
 
     @rx.event
     def set_new_payment_method(self, method: str):
@@ -289,13 +1044,24 @@ class ReceiptState(rx.State):
 
     @rx.event
     def generate_reference(self):
-        import random
-
-        self.new_reference_id = f"REF{random.randint(100000, 999999)}"
+        """Reserve the next receipt number now; blank references get one on save."""
+        try:
+            with rx.session() as session:
+                self.new_reference_id = allocate_reference(
+                    session.connection(), self.new_date
+                )
+                session.commit()
+        except Exception as e:
+            logging.exception(f"Error reserving reference: {e}")
+            return rx.toast.error("Could not reserve a receipt number.")
 
     @rx.event
-    def save_receipt(self):
+    async def save_receipt(self, submission_key: str = ""):
         """Validate and save a new receipt."""
+        if submission_key:
+            prior = _find_submission(submission_key)
+            if prior:
+                return rx.toast.info(f"Receipt {prior[1]} was already saved.")
         if (
             not self.new_student_name
             or not self.new_admission_number
@@ -303,47 +1069,53 @@ class ReceiptState(rx.State):
         ):
             return rx.toast.error("Please fill in all required fields.")
         try:
-            amount_float = float(self.new_amount)
-            if amount_float <= 0:
+            amount_cents = to_cents(self.new_amount)
+            if amount_cents <= 0:
                 return rx.toast.error("Amount must be greater than 0.")
-        except ValueError as e:
+        except InvalidOperation as e:
             logging.exception(f"Error parsing amount: {e}")
             return rx.toast.error("Invalid amount format.")
-        if not self.new_reference_id:
-            self.generate_reference()
         try:
-            with rx.session() as session:
-                existing = session.exec(
-                    select(Receipt).where(Receipt.reference_id == self.new_reference_id)
-                ).first()
-                if existing:
-                    return rx.toast.error(
-                        "Reference ID already exists. Please generate a new one."
-                    )
-                new_receipt = Receipt(
-                    student_name=self.new_student_name,
-                    admission_number=self.new_admission_number,
-                    class_grade=self.new_class_grade,
-                    payer_name=self.new_payer_name,
-                    amount=amount_float,
-                    payment_method=self.new_payment_method,
-                    reference_id=self.new_reference_id,
-                    date=self.new_date,
-                    notes=self.new_notes,
-                    created_at=datetime.now().isoformat(),
+            datetime.strptime(self.new_date[:10], "%Y-%m-%d")
+        except ValueError:
+            return rx.toast.error("Please enter a valid date.")
+        try:
+            values = dict(
+                student_name=self.new_student_name,
+                admission_number=self.new_admission_number,
+                class_grade=self.new_class_grade,
+                payer_name=self.new_payer_name,
+                amount_cents=amount_cents,
+                payment_method=self.new_payment_method,
+                reference_id=self.new_reference_id,
+                date=self.new_date,
+                day=self.new_date[:10],
+                notes=self.new_notes,
+                created_at=datetime.now().isoformat(),
+            )
+            inserted = await _insert_receipt(values, submission_key)
+            if inserted is None:
+                return rx.toast.error(
+                    "Reference ID already exists. Please generate a new one."
                 )
-                session.add(new_receipt)
-                session.commit()
-            self.load_receipts()
-            self.load_stats()
+            _, reference_id, replayed = inserted
+            if replayed:
+                return rx.toast.info(f"Receipt {reference_id} was already saved.")
+            self._apply_feed()
             self.clear_form()
             return rx.toast.success("Receipt saved successfully!")
         except Exception as e:
             logging.exception(f"Error saving receipt: {e}")
             return rx.toast.error("Database error occurred while saving receipt.")
 
+    @rx.event
+    def open_receipt_form(self):
+        """Start a fresh submission key when the new receipt form opens."""
+        self.submission_key = uuid.uuid4().hex
+
     @rx.event
     def clear_form(self):
+        self.submission_key = uuid.uuid4().hex
         self.new_student_name = ""
         self.new_admission_number = ""
         self.new_class_grade = ""
@@ -365,20 +1137,11 @@ class ReceiptState(rx.State):
         self.receipt_to_delete_id = ""
 
     @rx.event
-    def delete_receipt(self):
+    async def delete_receipt(self):
         if self.receipt_to_delete_id:
             try:
-                with rx.session() as session:
-                    receipt = session.exec(
-                        select(Receipt).where(
-                            Receipt.reference_id == self.receipt_to_delete_id
-                        )
-                    ).first()
-                    if receipt:
-                        session.delete(receipt)
-                        session.commit()
-                self.load_receipts()
-                self.load_stats()
+                if await _delete_receipt(self.receipt_to_delete_id):
+                    self._apply_feed()
                 self.is_delete_modal_open = False
                 self.receipt_to_delete_id = ""
                 return rx.toast.success("Receipt deleted.")
@@ -387,7 +1150,15 @@ class ReceiptState(rx.State):
                 return rx.toast.error("Failed to delete receipt.")
 
     @rx.event
-    def load_view_receipt(self, ref_id: str):
-        """Load specific receipt for view page based on URL param."""
-        if ref_id:
-            self.view_receipt_id = ref_id
\ No newline at end of file
+    def load_view_receipt(self, ref_id: str = ""):
+        """Load the full receipt for the view page from the URL param."""
+        ref_id = ref_id or self.router.page.params.get("ref_id", "")
+        self.view_receipt_id = ref_id
+        try:
+            with rx.session() as session:
+                self.selected_receipt = session.exec(
+                    select(Receipt).where(Receipt.reference_id == ref_id)
+                ).first()
+        except Exception as e:
+            logging.exception(f"Error loading receipt {ref_id}: {e}")
+            self.selected_receipt = None
\ No newline at end of file
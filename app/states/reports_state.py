@@ -1,8 +1,30 @@
 import reflex as rx
 from datetime import datetime, timedelta
-from app.states.receipt_state import ReceiptState
-from app.utils.export import generate_csv
+from app.utils.export import EXPORT_CHUNK_ROWS, export_url, write_query_csv
+from app.utils.money import to_float
+from app.utils.cache import analytics_cache
+from app.db import Receipt, ReceiptRollup
+from sqlmodel import select, func
 import logging
+import asyncio
+
+
+def _query_daily_totals(
+    session, start_date: str, end_date: str, class_grade: str
+) -> list[tuple]:
+    """Per-day totals and counts from the rollup table for a report period."""
+    query = (
+        select(
+            ReceiptRollup.day,
+            func.sum(ReceiptRollup.total_cents),
+            func.sum(ReceiptRollup.receipt_count),
+        )
+        .where(ReceiptRollup.day >= start_date, ReceiptRollup.day <= end_date)
+        .group_by(ReceiptRollup.day)
+    )
+    if class_grade:
+        query = query.where(ReceiptRollup.class_grade == class_grade)
+    return [tuple(row) for row in session.exec(query).all()]
 
 
 class ReportsState(rx.State):
@@ -11,63 +33,78 @@ class ReportsState(rx.State):
     start_date: str = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
     end_date: str = datetime.now().strftime("%Y-%m-%d")
     selected_class: str = ""
+    total_collected_period: float = 0.0
+    total_transactions_period: int = 0
+    income_over_time: list[dict] = []
 
-    @rx.var
-    async def filtered_receipts(self) -> list[dict]:
-        receipt_state = await self.get_state(ReceiptState)
-        receipts = receipt_state.all_receipts
-        filtered = []
-        for r in receipts:
-            r_date = r.date.split("T")[0]
-            if r_date < self.start_date or r_date > self.end_date:
-                continue
-            if self.selected_class and r.class_grade != self.selected_class:
-                continue
-            filtered.append(r)
-        return filtered
-
-    @rx.var
-    async def total_collected_period(self) -> float:
-        receipts = await self.filtered_receipts
-        return sum((r.amount for r in receipts))
-
-    @rx.var
-    async def total_transactions_period(self) -> int:
-        receipts = await self.filtered_receipts
-        return len(receipts)
+    @rx.event
+    def load_report(self):
+        """Load the period totals and daily income for the current filters.
 
-    @rx.var
-    async def income_over_time(self) -> list[dict]:
-        """Daily income for the selected period."""
-        receipts = await self.filtered_receipts
-        stats = {}
-        curr = datetime.strptime(self.start_date, "%Y-%m-%d")
-        end = datetime.strptime(self.end_date, "%Y-%m-%d")
-        while curr <= end:
-            stats[curr.strftime("%Y-%m-%d")] = 0.0
-            curr += timedelta(days=1)
-        for r in receipts:
-            d = r.date.split("T")[0]
-            if d in stats:
-                stats[d] += r.amount
-        return [{"date": k, "amount": v} for k, v in stats.items()]
+        Results come from the shared analytics cache, so sessions viewing
+        the same period reuse one query until a receipt is written.
+        """
+        try:
+            stats = {}
+            curr = datetime.strptime(self.start_date, "%Y-%m-%d")
+            end = datetime.strptime(self.end_date, "%Y-%m-%d")
+            while curr <= end:
+                stats[curr.strftime("%Y-%m-%d")] = 0
+                curr += timedelta(days=1)
+            filters = (self.start_date, self.end_date, self.selected_class)
+            with rx.session() as session:
+                daily = analytics_cache.get_or_load(
+                    session,
+                    ("report", *filters),
+                    lambda s: _query_daily_totals(s, *filters),
+                )
+            total = 0
+            count = 0
+            for day, day_total, day_count in daily:
+                stats[day] = day_total
+                total += day_total
+                count += day_count
+            self.total_collected_period = to_float(total)
+            self.total_transactions_period = count
+            self.income_over_time = [
+                {"date": k, "amount": to_float(v)} for k, v in stats.items()
+            ]
+        except Exception as e:
+            logging.exception(f"Error loading report: {e}")
+            self.total_collected_period = 0.0
+            self.total_transactions_period = 0
+            self.income_over_time = []
 
     @rx.event
     def set_start_date(self, date: str):
         self.start_date = date
+        self.load_report()
 
     @rx.event
     def set_end_date(self, date: str):
         self.end_date = date
+        self.load_report()
 
     @rx.event
     def set_selected_class(self, class_name: str):
         self.selected_class = class_name
+        self.load_report()
 
     @rx.event
     async def download_csv(self):
-        receipts = await self.filtered_receipts
-        csv_string = generate_csv(receipts)
-        return rx.download(
-            data=csv_string, filename=f"report_{self.start_date}_{self.end_date}.csv"
-        )
\ No newline at end of file
+        """Stream the period's receipts to a CSV file and download it."""
+        query = (
+            select(Receipt)
+            .where(Receipt.day >= self.start_date, Receipt.day <= self.end_date)
+            .order_by(Receipt.day, Receipt.id)
+            .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        )
+        if self.selected_class:
+            query = query.where(Receipt.class_grade == self.selected_class)
+        filename = f"report_{self.start_date}_{self.end_date}.csv"
+        try:
+            export_name = await asyncio.to_thread(write_query_csv, query, filename)
+        except Exception as e:
+            logging.exception(f"Error exporting CSV: {e}")
+            return rx.toast.error("Failed to export CSV.")
+        return rx.download(url=export_url(export_name), filename=filename)
@@ -3,7 +3,22 @@ from typing import Any
 from sqlmodel import select
 from app.db import Settings
 import logging
-from app.db_init import initialize_db
+from app.utils.retry import retry_on_lock
+from app.utils.cache import analytics_cache
+
+
+@retry_on_lock
+def _save_settings(settings_to_save: dict[str, Any]):
+    """Upsert each setting as a key/value row."""
+    with rx.session() as session:
+        for key, value in settings_to_save.items():
+            setting = session.exec(select(Settings).where(Settings.key == key)).first()
+            if setting:
+                setting.value = str(value)
+                session.add(setting)
+            else:
+                session.add(Settings(key=key, value=str(value)))
+        session.commit()
 
 
 class SettingsState(rx.State):
@@ -23,12 +38,12 @@ class SettingsState(rx.State):
     input_pin: str = ""
     is_authenticated: bool = False
     show_pin_modal: bool = False
+    cache_stats: dict[str, int] = {"hits": 0, "misses": 0, "entries": 0}
 
     @rx.event
     def on_mount(self):
         """Load settings from DB on mount."""
         try:
-            initialize_db()
             with rx.session() as session:
                 settings = session.exec(select(Settings)).all()
                 for s in settings:
@@ -40,6 +55,19 @@ class SettingsState(rx.State):
         except Exception as e:
             logging.exception(f"Error loading settings: {e}")
 
+    @rx.event
+    def load_cache_stats(self):
+        """Read the analytics cache hit/miss counters."""
+        self.cache_stats = analytics_cache.stats()
+
+    @rx.var
+    def cache_hit_rate(self) -> str:
+        """Share of analytics lookups served from the cache."""
+        lookups = self.cache_stats["hits"] + self.cache_stats["misses"]
+        if not lookups:
+            return "-"
+        return f"{self.cache_stats['hits'] / lookups:.0%}"
+
     @rx.event
     def toggle_sidebar(self):
         self.sidebar_open = not self.sidebar_open
@@ -57,7 +85,7 @@ class SettingsState(rx.State):
         setattr(self, field, value)
 
     @rx.event
-    def save_settings(self):
+    async def save_settings(self):
         """Persist settings to DB."""
         settings_to_save = {
             "school_name": self.school_name,
@@ -69,17 +97,7 @@ class SettingsState(rx.State):
             "cashier_pin": self.cashier_pin,
         }
         try:
-            with rx.session() as session:
-                for key, value in settings_to_save.items():
-                    setting = session.exec(
-                        select(Settings).where(Settings.key == key)
-                    ).first()
-                    if setting:
-                        setting.value = str(value)
-                        session.add(setting)
-                    else:
-                        session.add(Settings(key=key, value=str(value)))
-                session.commit()
+            await _save_settings(settings_to_save)
             return rx.toast.success("Settings saved successfully!")
         except Exception as e:
             logging.exception(f"Error saving settings: {e}")
@@ -0,0 +1,85 @@
+import asyncio
+import dataclasses
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+FEED_SIZE = 1000
+FEED_POLL_SECONDS = 5.0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ReceiptChange:
+    """One committed receipt change and the data version it was written at.
+
+    students is how the change moved the count of students with receipts,
+    worked out in the writing transaction.
+    """
+
+    seq: int
+    kind: str
+    row: Optional[dict]
+    version: int
+    students: int = 0
+
+
+class ReceiptFeed:
+    """Process-wide feed of committed receipt changes that open sessions wait on.
+
+    Writers publish an insert or delete with the receipt's values, or a
+    reload for bulk changes. Sessions keep their position in the feed and
+    apply whatever they have not seen yet as small deltas. Only the last
+    FEED_SIZE changes are kept; a session that falls further behind reloads.
+    """
+
+    def __init__(self, max_changes: int = FEED_SIZE):
+        self._changes: deque[ReceiptChange] = deque(maxlen=max_changes)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest change."""
+        with self._lock:
+            return self._seq
+
+    def publish(self, kind: str, row: Optional[dict], version: int, students: int = 0):
+        """Record a committed change and wake every waiting session."""
+        with self._lock:
+            self._seq += 1
+            change = ReceiptChange(self._seq, kind, row, version, students)
+            self._changes.append(change)
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError as e:
+                logging.debug(f"Skipping waiter on a closed loop: {e}")
+
+    def since(self, seq: int) -> Optional[list[ReceiptChange]]:
+        """Changes after seq, or None if some have already been dropped."""
+        with self._lock:
+            if self._seq - seq > len(self._changes):
+                return None
+            return [change for change in self._changes if change.seq > seq]
+
+    async def wait(self, seq: int, timeout: float = FEED_POLL_SECONDS):
+        """Wait until there is a change after seq, or the timeout passes."""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if self._seq > seq:
+                return
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+receipt_feed = ReceiptFeed()
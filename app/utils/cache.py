@@ -0,0 +1,68 @@
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+from sqlmodel import Session, select
+from app.db import DataVersion
+
+
+def current_write_version(session: Session) -> int:
+    """Read the receipt write version, bumped by triggers on every change."""
+    version = session.exec(
+        select(DataVersion.version).where(DataVersion.id == 1)
+    ).first()
+    return version or 0
+
+
+class AnalyticsCache:
+    """Process-wide cache of aggregate query results shared by all sessions.
+
+    Entries are keyed by the query name and its filters and remember the
+    write version they were computed at. Any committed receipt change bumps
+    the version, so stale entries are recomputed on their next lookup.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self, session: Session, key: tuple, loader: Callable[[Session], Any]
+    ) -> Any:
+        """Return the cached value for key, loading it if missing or stale."""
+        version = current_write_version(session)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+        value = loader(session)
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logging.debug(f"Analytics cache miss for {key[0]}: {self.stats()}")
+        return copy.deepcopy(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+
+analytics_cache = AnalyticsCache()
@@ -1,28 +1,54 @@
 import csv
+import gzip
 import io
 import json
+import os
+import tempfile
+import time
+import uuid
+from urllib.parse import quote
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+import reflex as rx
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse
+from starlette.routing import Route
 from app.db import Receipt
+from app.utils.money import format_amount
 
+CSV_HEADERS = [
+    "Reference ID",
+    "Date",
+    "Student Name",
+    "Admission Number",
+    "Class",
+    "Amount",
+    "Payment Method",
+    "Payer Name",
+    "Notes",
+]
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_MAX_AGE_SECONDS = 60 * 60
+EXPORT_DIR = Path(
+    os.environ.get("TOYA_EXPORT_DIR")
+    or Path(tempfile.gettempdir()) / "toya-exports"
+)
+EXPORT_ROUTE = "/_export"
+BACKUP_FORMAT = "toya-backup"
+BACKUP_VERSION = 2
 
-def generate_csv(receipts: list[Receipt]) -> str:
-    """Generate CSV string from a list of receipts."""
-    if not receipts:
-        return ""
+
+def iter_csv(
+    receipts: Iterable[Receipt], chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[str]:
+    """Yield CSV text in chunks of rows as receipts are read."""
     output = io.StringIO()
     writer = csv.writer(output)
-    headers = [
-        "Reference ID",
-        "Date",
-        "Student Name",
-        "Admission Number",
-        "Class",
-        "Amount",
-        "Payment Method",
-        "Payer Name",
-        "Notes",
-    ]
-    writer.writerow(headers)
-    for r in receipts:
+    writer.writerow(CSV_HEADERS)
+    for i, r in enumerate(receipts, start=1):
         writer.writerow(
             [
                 r.reference_id,
@@ -30,21 +56,111 @@ def generate_csv(receipts: list[Receipt]) -> str:
                 r.student_name,
                 r.admission_number,
                 r.class_grade,
-                r.amount,
+                format_amount(r.amount_cents),
                 r.payment_method,
                 r.payer_name,
                 r.notes,
             ]
         )
-    return output.getvalue()
+        if i % chunk_rows == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue()
+
+
+def export_path(filename: str) -> tuple[Path, str]:
+    """Reserve a unique file in the private exports folder.
+
+    Returns the path to write to and the name to download it by. The folder
+    is not served as static files; each export can be fetched once through
+    EXPORT_ROUTE. Unclaimed exports older than an hour are removed first.
+    """
+    EXPORT_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    cutoff = time.time() - EXPORT_MAX_AGE_SECONDS
+    for old in EXPORT_DIR.iterdir():
+        if old.is_file() and old.stat().st_mtime < cutoff:
+            old.unlink(missing_ok=True)
+    name = f"{uuid.uuid4().hex}_{filename}"
+    return EXPORT_DIR / name, name
+
+
+def export_url(name: str) -> rx.Var[str]:
+    """Backend URL the browser downloads an export from."""
+    route = json.dumps(f"{EXPORT_ROUTE}/{quote(name)}")
+    # Resolve against the upload URL so the backend host matches rx.get_upload_url.
+    base = rx.get_upload_url("")
+    return rx.Var(
+        _js_expr=f"new URL({route}, getBackendURL(env.UPLOAD)).href",
+        _var_type=str,
+        _var_data=base._get_all_var_data(),
+    )
+
+
+async def serve_export(request: Request):
+    """Send an export once, then delete it."""
+    name = request.path_params["name"]
+    path = EXPORT_DIR / name
+    if Path(name).name != name or name.startswith(".") or "_" not in name:
+        return PlainTextResponse("Not found", status_code=404)
+    claimed = path.with_name(f".{name}")
+    try:
+        path.rename(claimed)
+    except FileNotFoundError:
+        return PlainTextResponse("Not found", status_code=404)
+    return FileResponse(
+        claimed,
+        filename=name.split("_", 1)[1],
+        background=BackgroundTask(claimed.unlink, missing_ok=True),
+    )
+
+
+export_api = Starlette(routes=[Route(f"{EXPORT_ROUTE}/{{name}}", serve_export)])
+
+
+def write_csv_export(receipts: Iterable[Receipt], filename: str) -> str:
+    """Stream receipts into a CSV export file and return its export name."""
+    path, name = export_path(filename)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for chunk in iter_csv(receipts):
+            f.write(chunk)
+    return name
+
+
+def write_query_csv(query, filename: str) -> str:
+    """Run a receipt query on its own session and stream it into a CSV export."""
+    with rx.session() as session:
+        return write_csv_export(session.exec(query), filename)
+
 
+def write_json_backup(
+    columns: list[str], rows: Iterable[Sequence], settings: dict, filename: str
+) -> str:
+    """Stream a gzip-compressed JSON Lines backup and return its export name.
 
-def generate_json_backup(receipts: list[Receipt], settings: dict) -> str:
-    """Generate JSON string for full data backup."""
-    data = {
-        "version": "1.0",
-        "timestamp": "",
+    The first line is a header with the format version, creation time,
+    settings and receipt column names; every following line is one receipt
+    as a JSON array in that column order.
+    """
+    path, name = export_path(filename)
+    header = {
+        "format": BACKUP_FORMAT,
+        "version": BACKUP_VERSION,
+        "timestamp": datetime.now().isoformat(),
         "settings": settings,
-        "receipts": [r.dict() for r in receipts],
+        "columns": columns,
     }
-    return json.dumps(data, indent=2)
\ No newline at end of file
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(json.dumps(header) + "\n")
+        lines = []
+        for row in rows:
+            lines.append(encode(list(row)))
+            if len(lines) == EXPORT_CHUNK_ROWS:
+                lines.append("")
+                f.write("\n".join(lines))
+                lines = []
+        if lines:
+            lines.append("")
+            f.write("\n".join(lines))
+    return name
@@ -0,0 +1,27 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount: str | int | float | Decimal) -> int:
+    """Convert an amount in major units to integer cents.
+
+    Raises decimal.InvalidOperation if the amount is not a number.
+    """
+    value = Decimal(str(amount).strip()).quantize(CENT, rounding=ROUND_HALF_UP)
+    return int(value * 100)
+
+
+def to_decimal(cents: int) -> Decimal:
+    """Convert integer cents to an exact Decimal amount."""
+    return Decimal(cents).scaleb(-2)
+
+
+def to_float(cents: int) -> float:
+    """Convert integer cents to a float for charts and display."""
+    return float(to_decimal(cents))
+
+
+def format_amount(cents: int) -> str:
+    """Format integer cents as a plain two-decimal string."""
+    return f"{to_decimal(cents):.2f}"
@@ -1,12 +1,103 @@
 from num2words import num2words
+from num2words.lang_EN import Num2Word_EN
 import logging
+from functools import lru_cache
+from typing import Iterable
+from app.utils.money import format_amount, to_decimal
 
+WORDS_CACHE_SIZE = 4096
+WARM_AMOUNTS = 500
+CURRENCY_CODES = {
+    "$": "USD",
+    "US$": "USD",
+    "€": "EUR",
+    "£": "GBP",
+    "₹": "INR",
+    "KSh": "KES",
+    "Ksh": "KES",
+    "USh": "UGX",
+    "TSh": "TZS",
+    "₦": "NGN",
+    "R": "ZAR",
+}
+_SYMBOL_CODES = {symbol.upper(): code for symbol, code in CURRENCY_CODES.items()}
+CURRENCY_NAMES = {
+    "KES": (("shilling", "shillings"), ("cent", "cents")),
+    "UGX": (("shilling", "shillings"), ("cent", "cents")),
+    "TZS": (("shilling", "shillings"), ("cent", "cents")),
+    "NGN": (("naira", "naira"), ("kobo", "kobo")),
+    "ZAR": (("rand", "rand"), ("cent", "cents")),
+}
 
-def amount_to_words(amount: float, currency: str = "Dollars") -> str:
-    """Convert a numeric amount to words."""
+
+def currency_code(currency: str) -> str:
+    """Map a currency symbol or ISO code to an ISO code, ignoring case.
+
+    Blank means USD. Returns "" for a currency num2words does not know.
+    """
+    code = currency.strip().upper()
+    if not code:
+        return "USD"
+    if code in Num2Word_EN.CURRENCY_FORMS or code in CURRENCY_NAMES:
+        return code
+    return _SYMBOL_CODES.get(code, "")
+
+
+@lru_cache(maxsize=WORDS_CACHE_SIZE)
+def _amount_words(amount_cents: int, code: str, symbol: str = "") -> str:
+    whole, cents = divmod(amount_cents, 100)
+    if code in CURRENCY_NAMES:
+        major, minor = CURRENCY_NAMES[code]
+        text = (
+            f"{num2words(whole)} {major[whole != 1]}, "
+            f"{num2words(cents)} {minor[cents != 1]}"
+        )
+    elif code:
+        text = num2words(to_decimal(amount_cents), to="currency", currency=code)
+    else:
+        text = num2words(whole).title()
+        if cents:
+            text += f" And {cents:02d}/100"
+        return f"{symbol} {text}".strip()
+    return text.title()
+
+
+def amount_to_words(amount_cents: int, currency: str = "USD") -> str:
+    """Convert an amount in cents to words, memoized per amount and currency.
+
+    The currency may be a settings symbol such as "KSh" or an ISO code. An
+    unknown currency is written as plain number words after its symbol.
+    """
     try:
-        text = num2words(amount, to="currency", currency="USD")
-        return text.title()
+        code = currency_code(currency)
+        return _amount_words(amount_cents, code, "" if code else currency.strip())
     except Exception as e:
         logging.exception(f"Error converting amount to words: {e}")
-        return f"{amount:.2f}"
\ No newline at end of file
+        return format_amount(amount_cents)
+
+
+def amounts_to_words(amounts_cents: Iterable[int], currency: str = "USD") -> dict:
+    """Convert many amounts at once, doing each distinct amount only once."""
+    return {cents: amount_to_words(cents, currency) for cents in set(amounts_cents)}
+
+
+def prewarm_amount_words():
+    """Warm the cache with the most common receipt amounts in the configured currency."""
+    import reflex as rx
+    from sqlmodel import select, func, desc
+    from app.db import Receipt, Settings
+
+    try:
+        with rx.session() as session:
+            setting = session.exec(
+                select(Settings.value).where(Settings.key == "currency_symbol")
+            ).first()
+            amounts = session.exec(
+                select(Receipt.amount_cents)
+                .group_by(Receipt.amount_cents)
+                .order_by(desc(func.count()))
+                .limit(WARM_AMOUNTS)
+            ).all()
+        amounts_to_words(amounts, setting or "$")
+    except Exception as e:
+        logging.exception(f"Error warming amount words: {e}")
\ No newline at end of file
@@ -0,0 +1,371 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import IO, Iterable
+import qrcode
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+from app.utils.number_to_words import amount_to_words
+from app.utils.qr_code import receipt_qr_data
+
+PDF_CHUNK_PAGES = 50
+THERMAL_WIDTH = 80 * mm
+THERMAL_HEIGHT = 90 * mm
+LAYOUTS = ("a4", "thermal")
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def receipt_payload(
+    receipt, currency_symbol: str = "$", words: str | None = None
+) -> dict:
+    """Flatten a receipt into the plain values the PDF workers draw."""
+    try:
+        display_date = datetime.fromisoformat(receipt.date).strftime(
+            "%B %d, %Y • %I:%M %p"
+        )
+    except ValueError:
+        display_date = receipt.date
+    return {
+        "reference_id": receipt.reference_id,
+        "day": receipt.day,
+        "date": display_date,
+        "student_name": receipt.student_name,
+        "admission_number": receipt.admission_number,
+        "class_grade": receipt.class_grade,
+        "payer_name": receipt.payer_name,
+        "payment_method": receipt.payment_method,
+        "notes": receipt.notes or "",
+        "amount": f"{currency_symbol}{receipt.amount_cents / 100:,.2f}",
+        "words": words or amount_to_words(receipt.amount_cents, currency_symbol),
+        "qr": receipt_qr_data(receipt.reference_id, receipt.amount_cents, receipt.date),
+    }
+
+
+def _draw_qr(pdf: canvas.Canvas, data: str, x: float, y: float, size: float):
+    """Draw a QR code as one vector path with its bottom-left corner at x, y.
+
+    The mask pattern is fixed because scoring all eight masks costs more
+    than drawing the rest of the page.
+    """
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L, border=1, mask_pattern=0
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    cell = size / len(matrix)
+    pdf.setFillColorRGB(1, 1, 1)
+    pdf.rect(x, y, size, size, stroke=0, fill=1)
+    pdf.setFillColorRGB(0, 0, 0)
+    path = pdf.beginPath()
+    for row, modules in enumerate(matrix):
+        top = y + size - (row + 1) * cell
+        col = 0
+        while col < len(modules):
+            if not modules[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(modules) and modules[col]:
+                col += 1
+            path.rect(x + start * cell, top, (col - start) * cell, cell)
+    pdf.drawPath(path, stroke=0, fill=1)
+
+
+def _draw_lines(pdf, lines, x, y, font, size, leading, align="left"):
+    """Draw text lines downwards from y and return the next free baseline."""
+    pdf.setFont(font, size)
+    for line in lines:
+        if align == "right":
+            pdf.drawRightString(x, y, line)
+        elif align == "center":
+            pdf.drawCentredString(x, y, line)
+        else:
+            pdf.drawString(x, y, line)
+        y -= leading
+    return y
+
+
+def _draw_a4(pdf: canvas.Canvas, school: dict, r: dict):
+    """Draw the full receipt from the view page on one A4 page."""
+    width, height = A4
+    left, right = 25 * mm, width - 25 * mm
+    y = height - 30 * mm
+    pdf.setFillColorRGB(0.07, 0.09, 0.15)
+    _draw_lines(pdf, [school.get("school_name", "")], left, y, "Helvetica-Bold", 18, 0)
+    pdf.setFillColorRGB(0.42, 0.45, 0.5)
+    _draw_lines(pdf, [school.get("school_motto", "")], left, y - 14, "Helvetica", 9, 0)
+    contact = [
+        school.get("school_address", ""),
+        school.get("school_phone", ""),
+        school.get("school_email", ""),
+    ]
+    _draw_lines(pdf, contact, right, y + 6, "Helvetica", 8, 11, align="right")
+    y -= 34
+    pdf.setStrokeColorRGB(0.9, 0.91, 0.92)
+    pdf.line(left, y, right, y)
+
+    y -= 30
+    pdf.setFillColorRGB(0.07, 0.09, 0.15)
+    _draw_lines(
+        pdf, ["OFFICIAL RECEIPT"], width / 2, y, "Helvetica-Bold", 14, 0, "center"
+    )
+    y -= 28
+    _draw_lines(
+        pdf, [f"Receipt No: {r['reference_id']}"], left, y, "Courier-Bold", 10, 0
+    )
+    _draw_lines(pdf, [f"Date: {r['date']}"], right, y, "Helvetica-Bold", 10, 0, "right")
+
+    y -= 40
+    middle = width / 2
+    sections = [
+        (
+            left,
+            "STUDENT INFORMATION",
+            [
+                ("STUDENT NAME", r["student_name"]),
+                ("ADMISSION NO", r["admission_number"]),
+                ("CLASS / GRADE", r["class_grade"]),
+            ],
+        ),
+        (
+            middle + 10,
+            "PAYMENT DETAILS",
+            [
+                ("PAYER NAME", r["payer_name"]),
+                ("PAYMENT METHOD", r["payment_method"]),
+                ("RECEIVED BY", "Admin User"),
+            ],
+        ),
+    ]
+    for x, title, rows in sections:
+        row_y = y
+        pdf.setFillColorRGB(0.31, 0.27, 0.9)
+        _draw_lines(pdf, [title], x, row_y, "Helvetica-Bold", 8, 0)
+        row_y -= 22
+        for label, value in rows:
+            pdf.setFillColorRGB(0.42, 0.45, 0.5)
+            _draw_lines(pdf, [label], x, row_y, "Helvetica", 7, 0)
+            pdf.setFillColorRGB(0.07, 0.09, 0.15)
+            _draw_lines(pdf, [value], x, row_y - 12, "Helvetica-Bold", 10, 0)
+            row_y -= 32
+    y -= 22 + 32 * 3
+
+    if r["notes"]:
+        pdf.setFillColorRGB(0.42, 0.45, 0.5)
+        _draw_lines(pdf, ["NOTES"], left, y, "Helvetica-Bold", 8, 0)
+        pdf.setFillColorRGB(0.22, 0.25, 0.32)
+        notes = simpleSplit(r["notes"], "Helvetica", 9, right - left)
+        y = _draw_lines(pdf, notes, left, y - 14, "Helvetica", 9, 12) - 14
+
+    box_height = 28 * mm
+    y -= box_height
+    pdf.setFillColorRGB(0.07, 0.09, 0.15)
+    pdf.roundRect(left, y, right - left, box_height, 8, stroke=0, fill=1)
+    pdf.setFillColorRGB(0.8, 0.8, 0.8)
+    _draw_lines(
+        pdf, ["TOTAL AMOUNT"], left + 18, y + box_height - 24, "Helvetica-Bold", 8, 0
+    )
+    pdf.setFillColorRGB(1, 1, 1)
+    _draw_lines(pdf, [r["amount"]], left + 18, y + 22, "Helvetica-Bold", 24, 0)
+    qr_size = box_height - 10 * mm
+    _draw_qr(pdf, r["qr"], right - 18 - qr_size, y + 5 * mm, qr_size)
+
+    pdf.setFillColorRGB(0.42, 0.45, 0.5)
+    words = simpleSplit(
+        f"** {r['words'].upper()} **", "Helvetica-Oblique", 8, right - left
+    )
+    y = _draw_lines(pdf, words, width / 2, y - 16, "Helvetica-Oblique", 8, 11, "center")
+
+    y -= 50
+    pdf.setStrokeColorRGB(0.82, 0.84, 0.86)
+    pdf.line(right - 60 * mm, y, right, y)
+    _draw_lines(
+        pdf,
+        ["AUTHORIZED SIGNATURE"],
+        right - 30 * mm,
+        y - 12,
+        "Helvetica",
+        7,
+        0,
+        "center",
+    )
+
+    y -= 50
+    pdf.setStrokeColorRGB(0.95, 0.96, 0.96)
+    pdf.line(left, y, right, y)
+    pdf.setFillColorRGB(0.07, 0.09, 0.15)
+    _draw_lines(
+        pdf,
+        ["Thank you for your business!"],
+        width / 2,
+        y - 20,
+        "Helvetica-Bold",
+        10,
+        0,
+        "center",
+    )
+    pdf.setFillColorRGB(0.42, 0.45, 0.5)
+    _draw_lines(
+        pdf,
+        ["Please retain this receipt for your records."],
+        width / 2,
+        y - 34,
+        "Helvetica",
+        8,
+        0,
+        "center",
+    )
+
+
+def _draw_thermal(pdf: canvas.Canvas, school: dict, r: dict):
+    """Draw the compact batch print receipt on an 80mm roll page."""
+    width = THERMAL_WIDTH
+    left, right = 4 * mm, width - 4 * mm
+    y = THERMAL_HEIGHT - 8 * mm
+    name = simpleSplit(
+        school.get("school_name", ""), "Helvetica-Bold", 11, right - left
+    )
+    y = _draw_lines(pdf, name, width / 2, y, "Helvetica-Bold", 11, 13, "center")
+    y = _draw_lines(
+        pdf, ["RECEIPT"], width / 2, y - 2, "Helvetica-Bold", 9, 0, "center"
+    )
+    y -= 6
+    pdf.setDash(1, 2)
+    pdf.line(left, y, right, y)
+    y -= 12
+    _draw_lines(pdf, [f"Date: {r['day']}"], left, y, "Helvetica", 7, 0)
+    _draw_lines(
+        pdf, [f"Ref: {r['reference_id']}"], right, y, "Helvetica", 7, 0, "right"
+    )
+    y -= 16
+    details = [
+        f"Student: {r['student_name']}",
+        f"Adm No: {r['admission_number']}",
+        f"Class: {r['class_grade']}",
+        f"Paid by: {r['payer_name']} ({r['payment_method']})",
+    ]
+    y = _draw_lines(pdf, details, left, y, "Helvetica", 8, 11)
+    y = _draw_lines(
+        pdf, [f"Amount: {r['amount']}"], left, y - 2, "Helvetica-Bold", 10, 0
+    )
+    words = simpleSplit(r["words"], "Helvetica-Oblique", 7, right - left)
+    y = _draw_lines(pdf, words, left, y - 12, "Helvetica-Oblique", 7, 9)
+    pdf.line(left, y, right, y)
+    qr_size = 28 * mm
+    _draw_qr(pdf, r["qr"], (width - qr_size) / 2, y - 4 - qr_size, qr_size)
+
+
+def _render_chunk(job: tuple[str, dict, list[dict]]) -> bytes:
+    """Render one chunk of receipts to PDF bytes, one receipt per page."""
+    layout, school, receipts = job
+    buffer = io.BytesIO()
+    if layout == "thermal":
+        pdf = canvas.Canvas(buffer, pagesize=(THERMAL_WIDTH, THERMAL_HEIGHT))
+        draw = _draw_thermal
+    else:
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        draw = _draw_a4
+    pdf.setTitle("Receipts")
+    for receipt in receipts:
+        draw(pdf, school, receipt)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _get_executor(workers: int | None) -> ProcessPoolExecutor:
+    """Return the shared PDF process pool, starting it on first use."""
+    global _executor
+    workers = workers or os.cpu_count()
+    with _executor_lock:
+        if _executor is not None and _executor._max_workers != workers:
+            _executor.shutdown()
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
+            )
+        return _executor
+
+
+def render_receipts_pdf(
+    receipts: list[dict],
+    school: dict,
+    output: IO[bytes],
+    layout: str = "a4",
+    workers: int | None = None,
+    chunk_pages: int = PDF_CHUNK_PAGES,
+) -> int:
+    """Render receipt payloads to one PDF written to output.
+
+    Chunks of pages are drawn in parallel on a process pool and merged in
+    order. A single chunk is drawn in-process to skip the pool round trip.
+    Returns the number of pages written.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown receipt layout: {layout}")
+    jobs = [
+        (layout, school, receipts[i : i + chunk_pages])
+        for i in range(0, len(receipts), chunk_pages)
+    ]
+    if len(jobs) <= 1 or workers == 1:
+        chunks: Iterable[bytes] = map(_render_chunk, jobs)
+    else:
+        chunks = _get_executor(workers).map(_render_chunk, jobs)
+    writer = PdfWriter()
+    for chunk in chunks:
+        writer.append(PdfReader(io.BytesIO(chunk)))
+    writer.write(output)
+    return len(receipts)
+
+
+if __name__ == "__main__":
+    import argparse
+    from types import SimpleNamespace
+
+    parser = argparse.ArgumentParser(description="Benchmark receipt PDF rendering.")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--layout", choices=LAYOUTS, default="a4")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    args = parser.parse_args()
+    school = {
+        "school_name": "TOYA International Academy",
+        "school_motto": "Excellence in Education",
+        "school_address": "123 Education Lane, Knowledge City",
+        "school_phone": "+1 234 567 890",
+        "school_email": "admin@toya.edu",
+    }
+    receipts = [
+        receipt_payload(
+            SimpleNamespace(
+                reference_id=f"REF{i:06d}",
+                date="2025-01-15T09:30:00",
+                day="2025-01-15",
+                student_name=f"Student {i}",
+                admission_number=f"ADM{1000 + i}",
+                class_grade="Grade 4",
+                payer_name="Parent",
+                payment_method="Mobile Money",
+                notes="Term 1 fees",
+                amount_cents=1234567 + i,
+            )
+        )
+        for i in range(args.pages)
+    ]
+    for workers in args.workers:
+        started = time.perf_counter()
+        render_receipts_pdf(receipts, school, io.BytesIO(), args.layout, workers)
+        seconds = time.perf_counter() - started
+        print(
+            f"{args.layout} workers={workers}: {args.pages} pages in "
+            f"{seconds:.2f}s ({args.pages / seconds:,.0f} pages/s)"
+        )
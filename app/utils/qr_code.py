@@ -1,10 +1,22 @@
 import qrcode
 import io
+import os
 import base64
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+from app.utils.money import format_amount
 
+QR_CACHE_SIZE = 512
+QR_CACHE_DIR = os.environ.get("TOYA_QR_CACHE_DIR", "")
 
-def generate_qr_code(data: str) -> str:
-    """Generate a QR code for the given data and return it as a base64 string."""
+
+def generate_qr_code(data: str, fmt: str = "png") -> str:
+    """Generate a QR code for the given data and return it as a data URL.
+
+    The "svg" format draws the module matrix as a path without touching PIL.
+    """
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -13,8 +25,60 @@ def generate_qr_code(data: str) -> str:
     )
     qr.add_data(data)
     qr.make(fit=True)
+    if fmt == "svg":
+        return _svg_data_url(qr.get_matrix())
     img = qr.make_image(fill_color="black", back_color="white")
     buffer = io.BytesIO()
     img.save(buffer, format="PNG")
     img_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
-    return f"data:image/png;base64,{img_str}"
\ No newline at end of file
+    return f"data:image/png;base64,{img_str}"
+
+
+def _svg_data_url(matrix: list[list[bool]]) -> str:
+    """Encode a QR module matrix as an SVG path, one subpath per dark run."""
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+    svg = (
+        f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {size} {size}' "
+        f"shape-rendering='crispEdges'><path fill='#fff' d='M0 0h{size}v{size}H0z'/>"
+        f"<path d='{''.join(runs)}'/></svg>"
+    )
+    return "data:image/svg+xml," + quote(svg, safe=" '/=:,.-")
+
+
+def receipt_qr_data(reference_id: str, amount_cents: int, date: str) -> str:
+    """Build the QR payload printed on a receipt."""
+    return f"TOYA-REC:{reference_id}|AMT:{format_amount(amount_cents)}|DATE:{date}"
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def receipt_qr_code(
+    reference_id: str, amount_cents: int, date: str, fmt: str = "svg"
+) -> str:
+    """Return the QR data URL for a receipt, cached by its printed fields.
+
+    Set TOYA_QR_CACHE_DIR to also keep the images on disk across restarts.
+    """
+    data = receipt_qr_data(reference_id, amount_cents, date)
+    if not QR_CACHE_DIR:
+        return generate_qr_code(data, fmt)
+    digest = hashlib.sha256(f"{fmt}:{data}".encode("utf-8")).hexdigest()
+    path = Path(QR_CACHE_DIR) / f"{digest}.{fmt}.txt"
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    url = generate_qr_code(data, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(url, encoding="utf-8")
+    tmp.replace(path)
+    return url
\ No newline at end of file
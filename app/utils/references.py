@@ -0,0 +1,54 @@
+import os
+from datetime import date
+from sqlalchemy import Connection, Integer, cast, func, select
+from sqlalchemy.dialects.sqlite import insert
+from app.db import Receipt, ReferenceCounter
+
+REFERENCE_FORMAT = os.environ.get("TOYA_REFERENCE_FORMAT", "REF{year}-{seq:06d}")
+TERM_START_MONTHS = (1, 5, 9)
+
+
+def school_term(day: date) -> int:
+    """Number the school term (1-3) a day falls in."""
+    return sum(day.month >= month for month in TERM_START_MONTHS)
+
+
+def reference_parts(day: str, fmt: str = REFERENCE_FORMAT) -> tuple[str, str]:
+    """Split a reference format into its counter prefix and numbered suffix.
+
+    The format may use {year} and {term} and ends with {seq}. The text before
+    {seq} names the counter, so "REF{year}-{seq:06d}" restarts every year.
+    """
+    parsed = date.fromisoformat(day[:10])
+    head, _, tail = fmt.partition("{seq")
+    prefix = head.format(year=parsed.year, term=school_term(parsed))
+    return prefix, "{seq" + tail
+
+
+def _bump(connection: Connection, prefix: str, floor: int = 0) -> int:
+    statement = insert(ReferenceCounter).values(prefix=prefix, last_value=floor + 1)
+    statement = statement.on_conflict_do_update(
+        index_elements=["prefix"],
+        set_={"last_value": func.max(ReferenceCounter.last_value, floor) + 1},
+    ).returning(ReferenceCounter.last_value)
+    return connection.execute(statement).scalar_one()
+
+
+def allocate_reference(connection: Connection, day: str, resync: bool = False) -> str:
+    """Take the next reference number for a day's prefix.
+
+    The counter row is bumped with one INSERT ... ON CONFLICT DO UPDATE ...
+    RETURNING, so it must run inside the transaction that inserts the
+    receipt: a rolled back save gives the number back and concurrent
+    cashiers queue on the write lock. With resync, numbering first skips
+    past references already present, such as ones from a restored backup.
+    """
+    prefix, suffix = reference_parts(day)
+    floor = 0
+    if resync:
+        number = cast(func.substr(Receipt.reference_id, len(prefix) + 1), Integer)
+        query = select(func.max(number)).where(
+            Receipt.reference_id.op("GLOB")(f"{prefix}[0-9]*")
+        )
+        floor = connection.execute(query).scalar() or 0
+    return prefix + suffix.format(seq=_bump(connection, prefix, floor))
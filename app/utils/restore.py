@@ -0,0 +1,200 @@
+import csv
+import gzip
+import io
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import IO, Iterable, Iterator
+from sqlalchemy import Connection
+from sqlalchemy.dialects.sqlite import insert
+from app.db import Receipt, Settings
+from app.utils.export import BACKUP_FORMAT, CSV_HEADERS
+from app.utils.money import to_cents
+
+IMPORT_BATCH_ROWS = 5000
+RECEIPT_COLUMNS = [
+    "student_name",
+    "admission_number",
+    "class_grade",
+    "payer_name",
+    "amount_cents",
+    "payment_method",
+    "reference_id",
+    "date",
+    "day",
+    "notes",
+    "created_at",
+]
+CSV_COLUMNS = {
+    "Reference ID": "reference_id",
+    "Date": "date",
+    "Student Name": "student_name",
+    "Admission Number": "admission_number",
+    "Class": "class_grade",
+    "Amount": "amount",
+    "Payment Method": "payment_method",
+    "Payer Name": "payer_name",
+    "Notes": "notes",
+}
+
+
+@dataclass
+class ImportResult:
+    rows: int
+    seconds: float
+    settings: dict
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+
+def _text_stream(raw: IO[bytes], filename: str) -> IO[str]:
+    """Open an uploaded file as text, transparently un-gzipping it."""
+    magic = raw.read(2)
+    raw.seek(0)
+    if magic == b"\x1f\x8b" or filename.endswith(".gz"):
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+
+def _iter_json_lines(first_line: str, stream: IO[str]) -> tuple[dict, Iterator[dict]]:
+    header = json.loads(first_line)
+    if header.get("format") != BACKUP_FORMAT:
+        raise ValueError("Not a TOYA backup file.")
+    columns = header["columns"]
+
+    def rows():
+        for line in stream:
+            if line.strip():
+                yield dict(zip(columns, json.loads(line)))
+
+    return header.get("settings", {}), rows()
+
+
+def _iter_legacy_json(first_line: str, stream: IO[str]) -> tuple[dict, Iterator[dict]]:
+    data = json.loads(first_line + stream.read())
+    return data.get("settings", {}), iter(data.get("receipts", []))
+
+
+def _iter_csv(first_line: str, stream: IO[str]) -> tuple[dict, Iterator[dict]]:
+    headers = next(csv.reader([first_line]))
+    if headers != CSV_HEADERS:
+        raise ValueError("CSV headers do not match the receipt export format.")
+    reader = csv.reader(stream)
+    rows = ({CSV_COLUMNS[h]: v for h, v in zip(headers, row)} for row in reader)
+    return {}, rows
+
+
+def read_backup(raw: IO[bytes], filename: str) -> tuple[dict, Iterator[dict]]:
+    """Detect the backup format and return its settings and receipt records.
+
+    Accepts the JSON Lines backup (optionally gzipped), the legacy 1.0 JSON
+    backup and the receipt CSV export. Records are yielded lazily, except for
+    legacy JSON which has to be parsed as a whole.
+    """
+    stream = _text_stream(raw, filename)
+    first_line = stream.readline()
+    if first_line.startswith("{") and '"format"' in first_line:
+        return _iter_json_lines(first_line, stream)
+    if first_line.lstrip().startswith("{"):
+        return _iter_legacy_json(first_line, stream)
+    return _iter_csv(first_line.rstrip("\r\n"), stream)
+
+
+def normalize_receipt(record: dict) -> dict:
+    """Map a backup or CSV record onto receipt column values."""
+    values = {column: record.get(column) for column in RECEIPT_COLUMNS}
+    if values["amount_cents"] is None:
+        values["amount_cents"] = to_cents(record.get("amount", 0))
+    values["date"] = str(values["date"] or "")
+    values["day"] = values["day"] or values["date"][:10]
+    values["created_at"] = values["created_at"] or datetime.now().isoformat()
+    for column in RECEIPT_COLUMNS:
+        if values[column] is None:
+            values[column] = ""
+    if not values["reference_id"]:
+        raise ValueError("Every receipt needs a reference ID.")
+    return values
+
+
+def _batches(records: Iterable[dict], size: int) -> Iterator[list[tuple[dict, bool]]]:
+    """Normalized records in batches, each noting whether it had a created_at."""
+    batch = []
+    for record in records:
+        batch.append((normalize_receipt(record), bool(record.get("created_at"))))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _upsert(columns: list[str]):
+    """Insert receipts, updating the given columns of existing references."""
+    statement = insert(Receipt.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["reference_id"],
+        set_={
+            column: statement.excluded[column]
+            for column in columns
+            if column != "reference_id"
+        },
+    )
+
+
+def import_receipts(
+    connection: Connection,
+    records: Iterable[dict],
+    batch_size: int = IMPORT_BATCH_ROWS,
+) -> int:
+    """Upsert receipts by reference_id in batched executemany transactions.
+
+    Each batch commits on its own so cashiers are not locked out for the
+    whole restore. Triggers keep the search index, rollup and write version
+    in step with every batch. Records without a created_at, such as CSV
+    rows, keep the existing receipt's creation time.
+    """
+    upsert_all = _upsert(RECEIPT_COLUMNS)
+    upsert_keep_created = _upsert(
+        [column for column in RECEIPT_COLUMNS if column != "created_at"]
+    )
+    count = 0
+    for batch in _batches(records, batch_size):
+        dated = [values for values, has_created in batch if has_created]
+        undated = [values for values, has_created in batch if not has_created]
+        with connection.begin():
+            if dated:
+                connection.execute(upsert_all, dated)
+            if undated:
+                connection.execute(upsert_keep_created, undated)
+        count += len(batch)
+    return count
+
+
+def restore_settings(connection: Connection, settings: dict):
+    """Upsert the key/value settings carried in a backup."""
+    if not settings:
+        return
+    statement = insert(Settings.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["key"], set_={"value": statement.excluded.value}
+    )
+    with connection.begin():
+        connection.execute(
+            statement, [{"key": k, "value": str(v)} for k, v in settings.items()]
+        )
+
+
+def restore_backup(
+    connection: Connection, raw: IO[bytes], filename: str
+) -> ImportResult:
+    """Restore settings and receipts from an uploaded backup or CSV file."""
+    started = time.perf_counter()
+    settings, records = read_backup(raw, filename)
+    rows = import_receipts(connection, records)
+    restore_settings(connection, settings)
+    return ImportResult(
+        rows=rows, seconds=time.perf_counter() - started, settings=settings
+    )
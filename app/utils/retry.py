@@ -0,0 +1,44 @@
+import asyncio
+import functools
+import logging
+import random
+from sqlalchemy.exc import OperationalError
+
+LOCK_MESSAGES = ("database is locked", "database table is locked", "busy")
+
+
+def is_lock_error(error: Exception) -> bool:
+    """Whether an error is SQLite reporting lock contention."""
+    return isinstance(error, OperationalError) and any(
+        (message in str(error.orig).lower() for message in LOCK_MESSAGES)
+    )
+
+
+def retry_on_lock(func=None, *, attempts: int = 5, base_delay: float = 0.05):
+    """Retry a database write with jittered exponential backoff while locked.
+
+    The decorated function becomes awaitable. Each attempt runs on a worker
+    thread and the backoff waits with asyncio.sleep, so a locked database
+    never holds up the event loop. The wrapped function must open and
+    commit its own session, so each attempt starts a fresh transaction.
+    """
+    if func is None:
+        return functools.partial(
+            retry_on_lock, attempts=attempts, base_delay=base_delay
+        )
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        for attempt in range(attempts):
+            try:
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except OperationalError as e:
+                if not is_lock_error(e) or attempt == attempts - 1:
+                    raise
+                delay = base_delay * 2**attempt + random.uniform(0, base_delay)
+                logging.warning(
+                    f"{func.__name__} hit a locked database, retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    return wrapper
@@ -0,0 +1,184 @@
+import re
+from typing import Optional
+import sqlalchemy
+
+receipt_fts = sqlalchemy.table(
+    "receipt_fts",
+    sqlalchemy.column("rowid"),
+    sqlalchemy.column("rank"),
+    sqlalchemy.column("receipt_fts"),
+)
+receipt_code_fts = sqlalchemy.table(
+    "receipt_code_fts",
+    sqlalchemy.column("rowid"),
+    sqlalchemy.column("receipt_code_fts"),
+)
+SUBSTRING_MIN_DIGITS = 3
+SEARCH_MIN_CHARS = 2
+SEARCH_RANK_LIMIT = 1000
+
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS receipt_fts USING fts5(
+        student_name, admission_number, reference_id, payer_name, notes,
+        content='receipt', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_fts_insert AFTER INSERT ON receipt BEGIN
+        INSERT INTO receipt_fts(
+            rowid, student_name, admission_number, reference_id, payer_name, notes
+        ) VALUES (
+            new.id, new.student_name, new.admission_number, new.reference_id,
+            new.payer_name, new.notes
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_fts_delete AFTER DELETE ON receipt BEGIN
+        INSERT INTO receipt_fts(
+            receipt_fts, rowid, student_name, admission_number, reference_id,
+            payer_name, notes
+        ) VALUES (
+            'delete', old.id, old.student_name, old.admission_number,
+            old.reference_id, old.payer_name, old.notes
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_fts_update AFTER UPDATE ON receipt BEGIN
+        INSERT INTO receipt_fts(
+            receipt_fts, rowid, student_name, admission_number, reference_id,
+            payer_name, notes
+        ) VALUES (
+            'delete', old.id, old.student_name, old.admission_number,
+            old.reference_id, old.payer_name, old.notes
+        );
+        INSERT INTO receipt_fts(
+            rowid, student_name, admission_number, reference_id, payer_name, notes
+        ) VALUES (
+            new.id, new.student_name, new.admission_number, new.reference_id,
+            new.payer_name, new.notes
+        );
+    END
+    """,
+]
+
+
+CODE_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS receipt_code_fts USING fts5(
+        admission_number, reference_id,
+        content='receipt', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_code_fts_insert AFTER INSERT ON receipt
+    BEGIN
+        INSERT INTO receipt_code_fts(rowid, admission_number, reference_id)
+        VALUES (new.id, new.admission_number, new.reference_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_code_fts_delete AFTER DELETE ON receipt
+    BEGIN
+        INSERT INTO receipt_code_fts(
+            receipt_code_fts, rowid, admission_number, reference_id
+        ) VALUES ('delete', old.id, old.admission_number, old.reference_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS receipt_code_fts_update AFTER UPDATE ON receipt
+    BEGIN
+        INSERT INTO receipt_code_fts(
+            receipt_code_fts, rowid, admission_number, reference_id
+        ) VALUES ('delete', old.id, old.admission_number, old.reference_id);
+        INSERT INTO receipt_code_fts(rowid, admission_number, reference_id)
+        VALUES (new.id, new.admission_number, new.reference_id);
+    END
+    """,
+]
+
+
+def search_terms(text: str) -> list[str]:
+    """Words of the search text long enough to look up in the index."""
+    return [t for t in re.findall(r"\w+", text) if len(t) >= SEARCH_MIN_CHARS]
+
+
+def build_match_query(text: str) -> str:
+    """Turn free-form search text into an FTS5 prefix query."""
+    return " ".join((f'"{t}"*' for t in search_terms(text)))
+
+
+def substring_terms(text: str) -> list[str]:
+    """Digit-only search terms that may also match inside a code."""
+    return [
+        t for t in search_terms(text) if t.isdigit() and len(t) >= SUBSTRING_MIN_DIGITS
+    ]
+
+
+def matching_receipt_ids(match: str) -> sqlalchemy.Select:
+    """Select ids of receipts matching an FTS5 query."""
+    return sqlalchemy.select(receipt_fts.c.rowid).where(
+        receipt_fts.c.receipt_fts.match(match)
+    )
+
+
+def _code_ids(term: str) -> sqlalchemy.CompoundSelect:
+    """Ids where a digit term prefix-matches a column or sits inside a code."""
+    inside = sqlalchemy.select(receipt_code_fts.c.rowid).where(
+        receipt_code_fts.c.receipt_code_fts.match(f'"{term}"')
+    )
+    return sqlalchemy.union(matching_receipt_ids(f'"{term}"*'), inside)
+
+
+def search_ids(text: str) -> Optional[sqlalchemy.Select]:
+    """Select ids of receipts matching free-form search text, or None.
+
+    Every term has to prefix-match one of the indexed columns. Digit-only
+    terms of three or more digits may instead appear anywhere in the
+    admission number or reference, so "1009" finds ADM1009.
+    """
+    digits = list(dict.fromkeys(substring_terms(text)))
+    words = [t for t in search_terms(text) if t not in digits]
+    if words:
+        query = matching_receipt_ids(build_match_query(" ".join(words)))
+        # +0 filters the word matches instead of probing FTS5 once per code id.
+        ids = receipt_fts.c.rowid + 0
+    elif digits:
+        first = _code_ids(digits.pop(0)).subquery()
+        query = sqlalchemy.select(first.c.rowid)
+        ids = first.c.rowid
+    else:
+        return None
+    for term in digits:
+        query = query.where(ids.in_(_code_ids(term)))
+    return query
+
+
+def search_condition(id_column, text: str, broad: bool = False):
+    """Condition on receipt ids for free-form search text, or None.
+
+    For broad searches the id is wrapped so SQLite walks the date index and
+    stops at the page limit instead of sorting every match.
+    """
+    ids = search_ids(text)
+    if ids is None:
+        return None
+    if broad:
+        id_column = id_column + 0
+    return id_column.in_(ids)
+
+
+def limited_matches(table, text: str, filters: list, limit: int) -> sqlalchemy.Select:
+    """Select at most limit ids of receipts matching the search and filters.
+
+    Word-only searches read the index in its own order, so a broad search
+    stops after limit rows instead of collecting every match first.
+    """
+    query = sqlalchemy.select(table.c.id).where(*filters).limit(limit)
+    if substring_terms(text):
+        return query.where(search_condition(table.c.id, text))
+    return query.select_from(
+        receipt_fts.join(table, table.c.id == receipt_fts.c.rowid)
+    ).where(receipt_fts.c.receipt_fts.match(build_match_query(text)))
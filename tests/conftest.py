@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DB_DIR = tempfile.mkdtemp(prefix="toya-tests-")
+os.environ["REFLEX_DB_URL"] = f"sqlite:///{DB_DIR}/test.db"
+os.environ["TOYA_SEED_SAMPLE_DATA"] = "0"
+os.environ["TOYA_EXPORT_DIR"] = f"{DB_DIR}/exports"
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT))
+
+import pytest
+import reflex as rx
+import sqlalchemy
+from app.db_init import initialize_db
+from app.utils.cache import analytics_cache
+
+CLASSES = ["PLAY GROUP", "PP1", "PP2", "GRADE 1", "GRADE 2", "GRADE 3"]
+METHODS = ["Cash", "Bank Transfer", "Mobile Money"]
+RECEIPT_ROWS = 5000
+
+
+def receipt_values(i: int, prefix: str = "T") -> dict:
+    """Column values for the i-th generated test receipt."""
+    day = f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+    return {
+        "student_name": f"Student {i}",
+        "admission_number": f"ADM{i % 900:04d}",
+        "class_grade": CLASSES[i % len(CLASSES)],
+        "payer_name": f"Parent {i}",
+        "amount_cents": 1000 + i,
+        "payment_method": METHODS[i % len(METHODS)],
+        "reference_id": f"{prefix}{i:06d}",
+        "date": day,
+        "day": day,
+        "notes": "",
+        "created_at": "",
+    }
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The app engine on a migrated, populated test database."""
+    initialize_db()
+    with rx.session() as session:
+        engine = session.get_bind()
+    columns = ", ".join(receipt_values(0))
+    placeholders = ", ".join(f":{name}" for name in receipt_values(0))
+    with engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.text(f"INSERT INTO receipt ({columns}) VALUES ({placeholders})"),
+            [receipt_values(i) for i in range(RECEIPT_ROWS)],
+        )
+        connection.exec_driver_sql("ANALYZE")
+    return engine
+
+
+@pytest.fixture
+def captured_queries(engine):
+    """Collect the SELECT statements run through the engine during a test."""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    analytics_cache.clear()
+    sqlalchemy.event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    sqlalchemy.event.remove(engine, "before_cursor_execute", capture)
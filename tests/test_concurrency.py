@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import reflex as rx
+from sqlmodel import col, func, select
+from app.db import Receipt
+from app.states.receipt_state import _insert_receipt, _query_dashboard_stats
+from conftest import receipt_values
+
+WRITERS = 4
+READERS = 3
+RECEIPTS_PER_WRITER = 50
+LOCK_HELD_SECONDS = 1.0
+
+
+def test_writers_and_readers_run_without_lock_errors(engine):
+    """N cashiers saving while M sessions read stats and the list."""
+    errors = []
+    saved = []
+    writers_done = threading.Event()
+    start = threading.Barrier(WRITERS + READERS)
+
+    def write(writer: int):
+        try:
+            start.wait()
+            for i in range(RECEIPTS_PER_WRITER):
+                values = receipt_values(writer * RECEIPTS_PER_WRITER + i, "W")
+                inserted = asyncio.run(_insert_receipt(dict(values, reference_id="")))
+                saved.append(inserted[1])
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            start.wait()
+            while not writers_done.is_set():
+                with rx.session() as session:
+                    _query_dashboard_stats(session, "2026-01")
+                    session.exec(
+                        select(Receipt.reference_id)
+                        .where(Receipt.class_grade == "PP1")
+                        .order_by(col(Receipt.day).desc())
+                        .limit(50)
+                    ).all()
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(WRITERS)]
+    readers = [threading.Thread(target=read) for _ in range(READERS)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    writers_done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert len(saved) == len(set(saved)) == WRITERS * RECEIPTS_PER_WRITER
+    with rx.session() as session:
+        stored = session.exec(
+            select(func.count()).where(col(Receipt.reference_id).in_(saved))
+        ).one()
+    assert stored == WRITERS * RECEIPTS_PER_WRITER
+
+
+def test_locked_write_does_not_block_the_event_loop(engine):
+    """A save waiting on another writer's lock leaves other sessions running."""
+    locked = threading.Event()
+
+    def hold_write_lock():
+        with engine.connect() as connection:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            locked.set()
+            time.sleep(LOCK_HELD_SECONDS)
+            connection.exec_driver_sql("ROLLBACK")
+
+    async def save_while_ticking():
+        gaps = []
+        save = asyncio.create_task(
+            _insert_receipt(dict(receipt_values(0, "L"), reference_id=""))
+        )
+        last = time.perf_counter()
+        while not save.done():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+        return await save, max(gaps)
+
+    holder = threading.Thread(target=hold_write_lock)
+    holder.start()
+    locked.wait()
+    started = time.perf_counter()
+    inserted, longest_gap = asyncio.run(save_while_ticking())
+    holder.join()
+
+    assert inserted is not None
+    assert time.perf_counter() - started >= LOCK_HELD_SECONDS * 0.9
+    assert longest_gap < 0.2
\ No newline at end of file
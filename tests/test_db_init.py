@@ -0,0 +1,11 @@
+import pytest
+from app.db_init import MIN_SQLITE_VERSION, check_sqlite_version
+
+
+def test_old_sqlite_fails_startup_with_a_clear_error():
+    with pytest.raises(RuntimeError, match="SQLite 3.35.0 or newer"):
+        check_sqlite_version((3, 31, 1))
+
+
+def test_supported_sqlite_passes():
+    check_sqlite_version(MIN_SQLITE_VERSION)
\ No newline at end of file
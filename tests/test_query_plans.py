@@ -0,0 +1,84 @@
+import pytest
+from app.states.receipt_state import ReceiptState
+from app.states.reports_state import ReportsState
+
+FILTERS = [
+    {},
+    {"filter_class": "PP1"},
+    {"filter_date_start": "2026-03-01", "filter_date_end": "2026-04-30"},
+    {
+        "filter_class": "GRADE 1",
+        "filter_date_start": "2026-03-01",
+        "filter_date_end": "2026-04-30",
+    },
+]
+
+
+def full_scans(engine, statements) -> list[tuple[str, str]]:
+    """Plan steps that read a whole table without an index."""
+    scans = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).all()
+            for row in plan:
+                detail = row[3]
+                # Capped counts read back their own LIMITed subquery (anon_N).
+                if detail.startswith("SCAN ") and not (
+                    "USING" in detail
+                    or "VIRTUAL TABLE" in detail
+                    or detail.startswith("SCAN anon_")
+                ):
+                    scans.append((" ".join(statement.split()), detail))
+    return scans
+
+
+def assert_indexed(engine, statements):
+    assert statements, "no queries were captured"
+    assert full_scans(engine, statements) == []
+
+
+def receipt_state(**values) -> ReceiptState:
+    state = ReceiptState(_reflex_internal_init=True)
+    for name, value in values.items():
+        setattr(state, name, value)
+    return state
+
+
+def test_dashboard_stats_use_indexes(engine, captured_queries):
+    state = receipt_state()
+    state.load_stats()
+    assert state.receipts_count_val > 0
+    assert_indexed(engine, captured_queries)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_list_and_count_use_indexes(engine, captured_queries, filters):
+    state = receipt_state(**filters)
+    state.load_receipts()
+    state.next_page()
+    state.next_page()
+    state.prev_page()
+    assert state.total_count > 0
+    assert state.receipts
+    assert_indexed(engine, captured_queries)
+
+
+@pytest.mark.parametrize("text", ["Student 12", "0012", "Student 0012"])
+def test_search_uses_full_text_index(engine, captured_queries, text):
+    state = receipt_state()
+    state.set_search_query(text)
+    assert state.receipts
+    assert_indexed(engine, captured_queries)
+
+
+@pytest.mark.parametrize("selected_class", ["", "PP2"])
+def test_report_uses_indexes(engine, captured_queries, selected_class):
+    state = ReportsState(_reflex_internal_init=True)
+    state.start_date = "2026-01-01"
+    state.end_date = "2026-06-30"
+    state.selected_class = selected_class
+    state.load_report()
+    assert state.total_transactions_period > 0
+    assert_indexed(engine, captured_queries)
@@ -0,0 +1,186 @@
+import io
+import json
+import sqlalchemy
+from app.db import Receipt
+from app.utils.export import EXPORT_DIR, write_csv_export, write_json_backup
+from app.utils.restore import restore_backup
+from conftest import receipt_values
+
+RESTORE_ROWS = 40
+COMPARED = [
+    "reference_id",
+    "student_name",
+    "admission_number",
+    "class_grade",
+    "payer_name",
+    "amount_cents",
+    "payment_method",
+    "date",
+    "day",
+    "notes",
+]
+
+
+def add_receipts(engine, prefix: str) -> list[dict]:
+    """Insert RESTORE_ROWS receipts with references starting with prefix."""
+    rows = [
+        dict(
+            receipt_values(i, prefix),
+            notes=f"note {i}",
+            created_at=f"2026-01-01T00:00:{i % 60:02d}",
+        )
+        for i in range(RESTORE_ROWS)
+    ]
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.insert(Receipt.__table__), rows)
+    return rows
+
+
+def stored(engine, prefix: str) -> list[dict]:
+    with engine.connect() as connection:
+        result = connection.execute(
+            sqlalchemy.select(Receipt.__table__)
+            .where(Receipt.reference_id.startswith(prefix))
+            .order_by(Receipt.reference_id)
+        )
+        return [dict(row._mapping) for row in result]
+
+
+def totals(engine) -> tuple:
+    """Receipt and rollup sums, which must always agree."""
+    with engine.connect() as connection:
+        receipts = connection.exec_driver_sql(
+            "SELECT COALESCE(SUM(amount_cents), 0), COUNT(*) FROM receipt"
+        ).one()
+        rollup = connection.exec_driver_sql(
+            "SELECT COALESCE(SUM(total_cents), 0), COALESCE(SUM(receipt_count), 0)"
+            " FROM receiptrollup"
+        ).one()
+    assert tuple(receipts) == tuple(rollup)
+    return tuple(receipts)
+
+
+def delete(engine, prefix: str):
+    with engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.delete(Receipt.__table__).where(
+                Receipt.reference_id.startswith(prefix)
+            )
+        )
+
+
+def restore(engine, data: bytes, filename: str):
+    with engine.connect() as connection:
+        return restore_backup(connection, io.BytesIO(data), filename)
+
+
+def compared(rows: list[dict]) -> list[dict]:
+    return [{column: row[column] for column in COMPARED} for row in rows]
+
+
+def test_jsonl_backup_round_trips_receipts_settings_and_rollup(engine):
+    add_receipts(engine, "RJ")
+    before, before_totals = stored(engine, "RJ"), totals(engine)
+    columns = list(Receipt.__table__.columns.keys())
+    rows = [[row[column] for column in columns] for row in before]
+    name = write_json_backup(
+        columns, rows, {"school_name": "Round Trip"}, "backup.jsonl.gz"
+    )
+    delete(engine, "RJ")
+    assert totals(engine) != before_totals
+
+    result = restore(engine, (EXPORT_DIR / name).read_bytes(), name)
+
+    assert result.rows == RESTORE_ROWS
+    assert result.settings == {"school_name": "Round Trip"}
+    after = stored(engine, "RJ")
+    assert compared(after) == compared(before)
+    assert [r["created_at"] for r in after] == [r["created_at"] for r in before]
+    assert totals(engine) == before_totals
+    with engine.connect() as connection:
+        assert (
+            connection.exec_driver_sql(
+                "SELECT value FROM settings WHERE key = 'school_name'"
+            ).scalar()
+            == "Round Trip"
+        )
+
+
+def test_csv_export_round_trips_receipts_and_rollup(engine):
+    add_receipts(engine, "RC")
+    before, before_totals = stored(engine, "RC"), totals(engine)
+    name = write_csv_export([Receipt(**row) for row in before], "receipts.csv")
+    delete(engine, "RC")
+
+    result = restore(engine, (EXPORT_DIR / name).read_bytes(), name)
+
+    assert result.rows == RESTORE_ROWS
+    assert compared(stored(engine, "RC")) == compared(before)
+    assert totals(engine) == before_totals
+
+
+def test_legacy_json_backup_restores_float_amounts(engine):
+    records = [
+        {
+            "id": i,
+            "student_name": f"Legacy {i}",
+            "admission_number": f"ADM{i:04d}",
+            "class_grade": "PP1",
+            "payer_name": "Parent",
+            "amount": 1234.5 + i,
+            "payment_method": "Cash",
+            "reference_id": f"RL{i:06d}",
+            "date": "2025-05-06T10:00:00",
+            "notes": "",
+            "created_at": "2025-05-06T10:00:00",
+        }
+        for i in range(RESTORE_ROWS)
+    ]
+    before_totals = totals(engine)
+    data = json.dumps(
+        {"version": "1.0", "timestamp": "", "settings": {}, "receipts": records},
+        indent=2,
+    )
+
+    result = restore(engine, data.encode(), "toya_backup.json")
+
+    assert result.rows == RESTORE_ROWS
+    after = stored(engine, "RL")
+    assert [r["amount_cents"] for r in after] == [
+        123450 + i * 100 for i in range(RESTORE_ROWS)
+    ]
+    assert {r["day"] for r in after} == {"2025-05-06"}
+    added = sum(r["amount_cents"] for r in after)
+    assert totals(engine) == (
+        before_totals[0] + added,
+        before_totals[1] + RESTORE_ROWS,
+    )
+
+
+def test_csv_reimport_updates_rows_but_keeps_created_at(engine):
+    add_receipts(engine, "RU")
+    before = stored(engine, "RU")
+    changed = [Receipt(**dict(row, notes="edited")) for row in before]
+    name = write_csv_export(changed, "edited.csv")
+
+    restore(engine, (EXPORT_DIR / name).read_bytes(), name)
+
+    after = stored(engine, "RU")
+    assert {r["notes"] for r in after} == {"edited"}
+    assert [r["created_at"] for r in after] == [r["created_at"] for r in before]
+    assert [r["id"] for r in after] == [r["id"] for r in before]
+
+
+def test_backup_with_created_at_overwrites_it(engine):
+    add_receipts(engine, "RO")
+    before = stored(engine, "RO")
+    columns = list(Receipt.__table__.columns.keys())
+    rows = [
+        [dict(row, created_at="2020-02-02T00:00:00")[c] for c in columns]
+        for row in before
+    ]
+    name = write_json_backup(columns, rows, {}, "dated.jsonl.gz")
+
+    restore(engine, (EXPORT_DIR / name).read_bytes(), name)
+
+    assert {r["created_at"] for r in stored(engine, "RO")} == {"2020-02-02T00:00:00"}
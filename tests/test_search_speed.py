@@ -0,0 +1,56 @@
+import time
+import pytest
+from app.states.receipt_state import ReceiptState
+
+SEARCH_ROWS = 300_000
+ATTEMPTS = 3
+# Search text and the most one debounced keystroke may take, in ms.
+SEARCHES = [
+    ("S", 50),
+    ("Stu", 250),
+    ("Parent", 250),
+    ("Student 12345", 250),
+    ("12345", 50),
+    ("ADM00123", 50),
+    ("zzz", 50),
+]
+
+
+@pytest.fixture(scope="module")
+def large_table(engine):
+    """Add SEARCH_ROWS receipts where every name matches the broad searches."""
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"""
+            WITH RECURSIVE n(i) AS (
+                SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < {SEARCH_ROWS - 1}
+            )
+            INSERT INTO receipt (
+                student_name, admission_number, class_grade, payer_name,
+                amount_cents, payment_method, reference_id, date, day, notes,
+                created_at
+            )
+            SELECT 'Student ' || i, printf('ADM%05d', i % 20000),
+                'GRADE ' || (i % 6 + 1), 'Parent ' || i, 1000 + i % 5000, 'Cash',
+                printf('S%07d', i), day, day, '', ''
+            FROM (
+                SELECT i, printf('%04d-%02d-%02d', 2020 + i % 7, i % 12 + 1,
+                    i % 28 + 1) AS day
+                FROM n
+            )
+        """)
+        connection.exec_driver_sql("ANALYZE")
+    return engine
+
+
+@pytest.mark.parametrize("text,budget_ms", SEARCHES)
+def test_search_keystroke_is_fast_on_a_large_table(large_table, text, budget_ms):
+    """Count plus first page for one keystroke, best of ATTEMPTS runs."""
+    state = ReceiptState(_reflex_internal_init=True)
+    timings = []
+    for _ in range(ATTEMPTS):
+        start = time.perf_counter()
+        state.set_search_query(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{text!r}: {min(timings):.1f} ms, {state.total_count_label} matches")
+    assert len(state.receipts) == min(state.total_count, state.page_size)
+    assert min(timings) < budget_ms
\ No newline at end of file
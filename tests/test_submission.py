@@ -0,0 +1,53 @@
+import asyncio
+import reflex as rx
+from sqlmodel import func, select
+from app.db import Receipt
+from app.states.receipt_state import ReceiptState, _insert_receipt
+from conftest import receipt_values
+
+SUBMISSION_KEY = "replayed-submission"
+
+
+def fill_form(state: ReceiptState):
+    state.new_student_name = "Replay Student"
+    state.new_admission_number = "ADM-REPLAY"
+    state.new_class_grade = "PP2"
+    state.new_payer_name = "Replay Parent"
+    state.new_amount = "250.00"
+    state.new_payment_method = "Cash"
+    state.new_date = "2026-10-18"
+
+
+def stats(state: ReceiptState) -> tuple:
+    return (
+        state.receipts_count_val,
+        state._total_cents,
+        state.active_students_count_val,
+    )
+
+
+def test_replayed_submission_saves_one_receipt(engine):
+    """A double click or replayed event inserts once and moves stats once."""
+    state = ReceiptState(_reflex_internal_init=True)
+    state.load_stats()
+    before = stats(state)
+
+    fill_form(state)
+    asyncio.run(state.save_receipt(SUBMISSION_KEY))
+    after_first = stats(state)
+    fill_form(state)
+    asyncio.run(state.save_receipt(SUBMISSION_KEY))
+    replay = asyncio.run(
+        _insert_receipt(dict(receipt_values(1, "X"), reference_id=""), SUBMISSION_KEY)
+    )
+
+    with rx.session() as session:
+        saved = session.exec(
+            select(func.count()).where(Receipt.admission_number == "ADM-REPLAY")
+        ).one()
+    assert saved == 1
+    assert replay[2] is True
+    assert after_first == (before[0] + 1, before[1] + 25000, before[2] + 1)
+    assert stats(state) == after_first
+    state.load_stats()
+    assert stats(state) == after_first